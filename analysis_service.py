@@ -0,0 +1,334 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from languages import LANGUAGE_NAMES, base_language, language_stop_words
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Request latencies kept for the percentiles in the stats
+LATENCY_WINDOW = 1000
+
+# Recent throughput is measured over this many seconds
+THROUGHPUT_WINDOW = 60
+
+# Largest request body accepted, far more than any batch of URLs needs
+MAX_BODY_BYTES = 1 << 20
+
+# Tells a worker thread to exit
+_STOP = object()
+
+class QueueFull(Exception):
+    """Raised when as many requests are already waiting as the service queues."""
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of already sorted values, None when there are none."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def summarize_latencies(seconds):
+    """Return the p50, p90, p99 and maximum of durations in seconds, in milliseconds."""
+    seconds = sorted(seconds)
+    summary = {}
+    for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0)):
+        value = percentile(seconds, fraction)
+        summary[name] = None if value is None else round(value * 1000, 2)
+    return summary
+
+class ServiceStats:
+    """Thread-safe latency and throughput counters of an AnalysisService.
+
+    Latency covers a request from being queued to its results being ready,
+    so it includes the time spent waiting for a free worker, which is also
+    reported on its own.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.videos = 0
+        self.failed_videos = 0
+        self.errors = 0
+        self.rejected = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+        # (finish time, videos) of recent requests, for the recent throughput
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def record(self, latency, wait, videos, failed_videos, error=False):
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            self.videos += videos
+            self.failed_videos += failed_videos
+            self.errors += int(error)
+            self._latencies.append(latency)
+            self._waits.append(wait)
+            self._recent.append((now, videos))
+            self._trim(now)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def _trim(self, now):
+        while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW:
+            self._recent.popleft()
+
+    def snapshot(self):
+        """Return the counters, latency percentiles in milliseconds and throughput per second."""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            uptime = now - self.started
+            window = min(uptime, THROUGHPUT_WINDOW)
+            recent_videos = sum(videos for _, videos in self._recent)
+            return {
+                'uptime_seconds': round(uptime, 1),
+                'requests': self.requests,
+                'videos': self.videos,
+                'failed_videos': self.failed_videos,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'latency_ms': summarize_latencies(self._latencies),
+                'queue_wait_ms': summarize_latencies(self._waits),
+                'throughput': {
+                    'requests_per_second': round(self.requests / uptime, 3) if uptime else 0.0,
+                    'videos_per_second': round(self.videos / uptime, 3) if uptime else 0.0,
+                    'recent_requests_per_second': round(len(self._recent) / window, 3) if window else 0.0,
+                    'recent_videos_per_second': round(recent_videos / window, 3) if window else 0.0
+                }
+            }
+
+class AnalysisService:
+    """Long-lived analysis of videos over one warm YouTubeTranscriber.
+
+    Requests are lists of video URLs, put on a bounded queue and taken off
+    it by ``workers`` threads, each processing one request at a time with
+    up to ``fetch_workers`` concurrent fetches. When ``queue_size``
+    requests are already waiting, submit raises QueueFull instead of
+    letting work pile up. The transcriber's LanguageTool checkers, caches,
+    fetcher and stop words outlive each request, so only the first one
+    pays for starting them (or none, after warm_up).
+    """
+
+    def __init__(self, transcriber, workers=1, queue_size=16, max_batch=100, fetch_workers=4):
+        self.transcriber = transcriber
+        self.max_batch = max_batch
+        self.fetch_workers = fetch_workers
+        self.stats = ServiceStats()
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._busy = 0
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def warm_up(self):
+        """Load the stop words and start a LanguageTool checker before the first request."""
+        transcriber = self.transcriber
+        languages = LANGUAGE_NAMES if transcriber.language == 'auto' else [base_language(transcriber.language)]
+        for language in languages:
+            language_stop_words(language)
+        if transcriber.language_tool is not None:
+            transcriber.language_tool.check('This sentence starts the checker.')
+
+    def submit(self, youtube_urls, min_occurrences=3):
+        """Queue a request and return a Future of its JSON results, in the order of youtube_urls.
+
+        Raises QueueFull when the queue is full and ValueError for a batch
+        larger than max_batch.
+        """
+        if len(youtube_urls) > self.max_batch:
+            raise ValueError(f'At most {self.max_batch} URLs per request, got {len(youtube_urls)}')
+
+        future = Future()
+        try:
+            self._jobs.put_nowait((list(youtube_urls), min_occurrences, future, time.monotonic()))
+        except queue.Full:
+            self.stats.record_rejected()
+            raise QueueFull(f'{self._jobs.maxsize} requests already waiting') from None
+        return future
+
+    def analyze(self, youtube_urls, min_occurrences=3):
+        """Submit a request and wait for its results."""
+        return self.submit(youtube_urls, min_occurrences).result()
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+
+            youtube_urls, min_occurrences, future, queued = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.monotonic()
+            with self._lock:
+                self._busy += 1
+            try:
+                results = self._process(youtube_urls, min_occurrences)
+            except Exception as e:
+                self.stats.record(time.monotonic() - queued, started - queued, 0, 0, error=True)
+                future.set_exception(e)
+            else:
+                failed = sum(1 for result in results if not result['success'])
+                self.stats.record(time.monotonic() - queued, started - queued, len(results), failed)
+                future.set_result(results)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+    def _process(self, youtube_urls, min_occurrences):
+        results = self.transcriber.process_videos(
+            youtube_urls, min_occurrences, 'json', max(1, min(self.fetch_workers, len(youtube_urls)))
+        )
+
+        # Results arrive in completion order; hand them back in the order they were asked for
+        by_url = {}
+        for result in results:
+            by_url.setdefault(result['video_url'], deque()).append(result)
+        return [by_url[youtube_url].popleft() for youtube_url in youtube_urls]
+
+    def status(self):
+        """Return the service and transcriber stats served at /stats."""
+        transcriber = self.transcriber
+        with self._lock:
+            busy = self._busy
+        status = self.stats.snapshot()
+        status['queued'] = self._jobs.qsize()
+        status['busy_workers'] = busy
+        status['workers'] = len(self._threads)
+
+        if transcriber.fetcher is not None:
+            status['fetcher'] = transcriber.fetcher.stats()
+        if transcriber.cache is not None:
+            status['cache'] = transcriber.cache.stats()
+        if transcriber.proofread_cache is not None:
+            status['proofread_cache'] = transcriber.proofread_cache.stats()
+        if transcriber.language_tool is not None:
+            status['languagetool_started'] = transcriber.language_tool.started
+        return status
+
+    def close(self):
+        """Let queued requests finish, then stop the worker threads."""
+        for _ in self._threads:
+            self._jobs.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON endpoints of the analysis service.
+
+    POST /analyze takes {"url": ...} and answers with that video's result,
+    or {"urls": [...]} and answers with {"results": [...]}; both accept
+    "min_occurrences". GET /stats returns AnalysisService.status() and
+    GET /health whether the service is up.
+    """
+
+    server_version = 'youtube-transcriber'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'queued': service.status()['queued']})
+        elif self.path == '/stats':
+            self._send(200, service.status())
+        else:
+            self._send(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send(404, {'error': f'Unknown path {self.path}'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Without a usable length the body can't be told apart from the next request
+            self._send(400, {'error': 'Invalid Content-Length'})
+            self.close_connection = True
+            return
+        if length > MAX_BODY_BYTES:
+            self._send(413, {'error': f'Request body over {MAX_BODY_BYTES} bytes'})
+            self.close_connection = True
+            return
+
+        try:
+            request = json.loads(self.rfile.read(length) or b'null')
+            youtube_urls, single, min_occurrences = parse_request(request)
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+
+        service = self.server.service
+        try:
+            future = service.submit(youtube_urls, min_occurrences)
+        except QueueFull as e:
+            self._send(503, {'error': f'Service busy: {e}'}, {'Retry-After': '1'})
+            return
+        except ValueError as e:
+            self._send(413, {'error': str(e)})
+            return
+
+        try:
+            results = future.result()
+        except Exception as e:
+            self._send(500, {'error': f'{type(e).__name__}: {e}'})
+            return
+        self._send(200, results[0] if single else {'results': results})
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def parse_request(request):
+    """Validate an /analyze body, returning (urls, whether a single url was given, min_occurrences)."""
+    if not isinstance(request, dict):
+        raise ValueError('Expected a JSON object with "url" or "urls"')
+
+    if 'urls' in request:
+        youtube_urls = request['urls']
+        single = False
+        if not isinstance(youtube_urls, list) or not youtube_urls:
+            raise ValueError('"urls" must be a non-empty list of video URLs')
+    elif 'url' in request:
+        youtube_urls = [request['url']]
+        single = True
+    else:
+        raise ValueError('Expected "url" or "urls"')
+    if not all(isinstance(youtube_url, str) for youtube_url in youtube_urls):
+        raise ValueError('Video URLs must be strings')
+
+    min_occurrences = request.get('min_occurrences', 3)
+    if not isinstance(min_occurrences, int) or isinstance(min_occurrences, bool) or min_occurrences < 1:
+        raise ValueError('"min_occurrences" must be a positive integer')
+    return youtube_urls, single, min_occurrences
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False):
+    """Create the HTTP server for a service; port 0 picks a free port, found in server.server_address."""
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
@@ -1,153 +1,133 @@
+import hashlib
 import streamlit as st
-import re
-from collections import Counter
 import pandas as pd
+from corpus_index import find_common_keywords
+from keyword_scoring import KeywordScorer, sort_by_score
+from keywords import frequent_words, parse_stop_words
+from languages import LANGUAGE_NAMES
+from near_duplicates import MinHasher, NearDuplicateFilter
+from parallel_counting import count_scripts
+from transcript_files import UnreadableTranscript, count_transcripts, count_uploads, iter_transcript_lines, iter_uploads
 
-def analyze_keywords(text, min_occurrences=3):
-    """Analyze keywords that appear more than a specified number of times."""
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove punctuation and special characters
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    # Split into words
-    words = text.split()
-    
-    # Comprehensive list of stop words to filter out
-    stop_words = {
-        # Articles
-        'a', 'an', 'the',
-        
-        # Pronouns
-        'i', 'me', 'my', 'mine', 'myself',
-        'you', 'your', 'yours', 'yourself', 'yourselves',
-        'he', 'him', 'his', 'himself',
-        'she', 'her', 'hers', 'herself',
-        'it', 'its', 'itself',
-        'we', 'us', 'our', 'ours', 'ourselves',
-        'they', 'them', 'their', 'theirs', 'themselves',
-        'this', 'that', 'these', 'those', 'which', 'who', 'whom', 'what', 'whose',
-        'who\'s', 'what\'s', 'that\'s', 'there\'s', 'here\'s',
-        
-        # Prepositions
-        'in', 'on', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 
-        'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to', 
-        'from', 'up', 'down', 'of', 'off', 'over', 'under', 'out',
-        
-        # Conjunctions
-        'and', 'but', 'or', 'nor', 'so', 'yet', 'as', 'than', 'because', 'while',
-        
-        # Common verbs
-        'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'shall', 'should',
-        'can', 'could', 'may', 'might', 'must', 'ought',
-        'go', 'goes', 'going', 'gone', 'went',
-        'come', 'comes', 'coming', 'came',
-        'get', 'gets', 'getting', 'got', 'gotten',
-        'make', 'makes', 'making', 'made',
-        'say', 'says', 'saying', 'said',
-        'know', 'knows', 'knowing', 'knew', 'known',
-        'think', 'thinks', 'thinking', 'thought',
-        'take', 'takes', 'taking', 'took', 'taken',
-        'see', 'sees', 'seeing', 'saw', 'seen',
-        'want', 'wants', 'wanting', 'wanted',
-        'look', 'looks', 'looking', 'looked',
-        'use', 'uses', 'using', 'used',
-        'tell', 'tells', 'telling', 'told',
-        'try', 'tries', 'trying', 'tried',
-        'ask', 'asks', 'asking', 'asked',
-        'need', 'needs', 'needing', 'needed',
-        'feel', 'feels', 'feeling', 'felt',
-        'become', 'becomes', 'becoming', 'became',
-        'leave', 'leaves', 'leaving', 'left',
-        'put', 'puts', 'putting',
-        'mean', 'means', 'meaning', 'meant',
-        'keep', 'keeps', 'keeping', 'kept',
-        'let', 'lets', 'letting',
-        'begin', 'begins', 'beginning', 'began', 'begun',
-        'seem', 'seems', 'seeming', 'seemed',
-        'help', 'helps', 'helping', 'helped',
-        'talk', 'talks', 'talking', 'talked',
-        'turn', 'turns', 'turning', 'turned',
-        'start', 'starts', 'starting', 'started',
-        'show', 'shows', 'showing', 'showed', 'shown',
-        'hear', 'hears', 'hearing', 'heard',
-        'play', 'plays', 'playing', 'played',
-        'run', 'runs', 'running', 'ran',
-        'move', 'moves', 'moving', 'moved',
-        'live', 'lives', 'living', 'lived',
-        'believe', 'believes', 'believing', 'believed',
-        'work', 'works', 'working', 'worked',
-        'happen', 'happens', 'happening', 'happened',
-        'done', 'doing', 'does', 
-        
-        # Contractions
-        'isn\'t', 'aren\'t', 'wasn\'t', 'weren\'t', 'haven\'t', 'hasn\'t', 'hadn\'t',
-        'don\'t', 'doesn\'t', 'didn\'t', 'won\'t', 'wouldn\'t', 'can\'t', 'couldn\'t',
-        'shouldn\'t', 'mightn\'t', 'mustn\'t', 'they\'d', 'i\'d', 'we\'d', 'he\'d', 'she\'d',
-        'you\'d', 'i\'ll', 'you\'ll', 'he\'ll', 'she\'ll', 'we\'ll', 'they\'ll',
-        'i\'m', 'you\'re', 'he\'s', 'she\'s', 'it\'s', 'we\'re', 'they\'re',
-        'i\'ve', 'you\'ve', 'we\'ve', 'they\'ve',
-        
-        # Adverbs
-        'very', 'really', 'just', 'now', 'then', 'here', 'there', 'when', 'where', 'why',
-        'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'some', 'such', 'no',
-        'not', 'only', 'same', 'so', 'than', 'too', 'well', 'again', 'ever', 'far',
-        'forward', 'fast', 'high', 'low', 'near', 'never', 'still', 'today',
-        'tomorrow', 'yesterday', 'almost', 'always', 'quickly', 'finally',
-        
-        # Numbers as words
-        'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
-        'first', 'second', 'third', 'fourth', 'fifth', 'hundred', 'thousand', 'million',
-        
-        # YouTube-specific common words
-        'like', 'subscribe', 'channel', 'video', 'comment', 'youtube', 'watch', 'click',
-        'today', 'gonna', 'let', 'tell', 'talk', 'show', 'thanks', 'thank',
-        
-        # Additional words to filter based on user feedback
-        'out', 'told', 'while', 'wasn\'t', 'asked', 'they\'d', 'done', 'tried', 'back', 'even', 'other', 'wasnt', 'since', 'didnt', 'away', 'also', 'once', 'enough', 'much', 'dont', 'around', 'mrs', 'until'
-    }
-    
-    # Filter out stop words and short words (less than 3 chars)
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-    
-    # Count occurrences
-    word_counts = Counter(filtered_words)
-    
-    # Filter to words that appear more than min_occurrences times
-    frequent_words = {word: count for word, count in word_counts.items() if count >= min_occurrences}
-    
-    # Sort by frequency (descending)
-    sorted_words = dict(sorted(frequent_words.items(), key=lambda item: item[1], reverse=True))
-    
-    return sorted_words, word_counts
+# Upper bound on the number of script counts and signatures kept in the caches
+MAX_CACHED_SCRIPTS = 64
 
-def find_common_keywords(all_keyword_counts, min_scripts, min_occurrences):
-    """Find keywords that appear in multiple scripts with minimum occurrences."""
-    if not all_keyword_counts:
-        return {}
-    
-    # Get unique words across all scripts
-    all_words = set()
-    for counts in all_keyword_counts:
-        all_words.update(counts.keys())
-    
-    # Find words that appear in at least min_scripts scripts with min_occurrences
-    common_keywords = {}
-    for word in all_words:
-        # Count in how many scripts this word appears with min_occurrences
-        script_count = sum(1 for counts in all_keyword_counts if counts.get(word, 0) >= min_occurrences)
-        
-        # If it appears in at least min_scripts scripts, add it to common_keywords
-        if script_count >= min_scripts:
-            # Calculate total occurrences across all scripts
-            total_count = sum(counts.get(word, 0) for counts in all_keyword_counts)
-            common_keywords[word] = total_count
-    
-    # Sort by total frequency
-    sorted_common = dict(sorted(common_keywords.items(), key=lambda item: item[1], reverse=True))
-    return sorted_common
+def keep_recent(cache, keys, max_entries=MAX_CACHED_SCRIPTS):
+    """Return the cache with keys as the most recently used entries, dropping the oldest beyond max_entries."""
+    used = set(keys)
+    recent = {key: value for key, value in cache.items() if key not in used}
+    recent.update((key, cache[key]) for key in keys)
+    return dict(list(recent.items())[-max_entries:])
+
+def count_pasted_scripts(scripts, script_hashes, extra_stop_words, max_n, max_terms, language):
+    """Tokenize and count each pasted script once per distinct text and counting settings.
+
+    Counts are kept in the session under a SHA-256 of the script, so reruns
+    with unchanged scripts skip tokenizing and threshold changes only
+    re-filter the cached counts. Only the MAX_CACHED_SCRIPTS most recently
+    used counts are kept. Changed scripts are counted together, across
+    worker processes when they are long enough to benefit.
+    """
+    settings = (extra_stop_words, max_n, max_terms, language)
+    keys = [(script_hash,) + settings for script_hash in script_hashes]
+    cached = st.session_state.get("script_counts", {})
+
+    missing = {key: script for key, script in zip(keys, scripts) if key not in cached}
+    if missing:
+        counted = count_scripts(list(missing.values()), frozenset(extra_stop_words), max_n, max_terms, language)
+        cached = {**cached, **dict(zip(missing, counted))}
+
+    st.session_state.script_counts = keep_recent(cached, keys)
+    return [cached[key] for key in keys]
+
+@st.cache_data(max_entries=MAX_CACHED_SCRIPTS, show_spinner=False)
+def script_minhash(script_hash, _script):
+    """MinHash signature of a script, computed once per distinct text."""
+    return MinHasher().signature(_script)
+
+def upload_minhashes(files):
+    """MinHash signatures of every readable uploaded transcript, reused while the uploads are unchanged.
+
+    Unreadable files are skipped, as count_uploaded_files skips them, so the
+    signatures line up with the counted uploads.
+    """
+    key = tuple((f.name, f.size, hashlib.sha256(f.getvalue()).hexdigest()) for f in files)
+    if st.session_state.get("upload_minhash_key") != key:
+        hasher = MinHasher()
+        minhashes = []
+        for name, data in iter_uploads(files):
+            try:
+                minhashes.append(hasher.signature_of_chunks(iter_transcript_lines(name, data)))
+            except UnreadableTranscript:
+                pass
+        st.session_state.upload_minhashes = minhashes
+        st.session_state.upload_minhash_key = key
+    return st.session_state.upload_minhashes
+
+def collapse_near_duplicates(counted_scripts, minhashes, threshold):
+    """Keep the first of each group of near-duplicate scripts.
+
+    Returns the kept scripts and (name, original name, similarity) for each
+    script dropped, found through an LSH index instead of comparing every pair.
+    """
+    duplicates = NearDuplicateFilter(threshold)
+    kept = []
+    collapsed = []
+    for index, (script, minhash) in enumerate(zip(counted_scripts, minhashes)):
+        duplicate = duplicates.check_signature(index, minhash)
+        if duplicate is None:
+            kept.append(script)
+        else:
+            original, score = duplicate
+            collapsed.append((script[0], counted_scripts[original][0], score))
+    return kept, collapsed
+
+def count_uploaded_files(files, extra_stop_words, max_n, max_terms, language):
+    """Count every uploaded transcript, reusing the last counts while the uploads are unchanged.
+
+    Returns the counted transcripts and the names of files that could not
+    be read. Only the word counts are kept in the session, never the parsed
+    text.
+    """
+    signature = (
+        tuple((f.name, f.size, hashlib.sha256(f.getvalue()).hexdigest()) for f in files),
+        extra_stop_words,
+        max_n,
+        max_terms,
+        language
+    )
+    if st.session_state.get("upload_signature") == signature:
+        return st.session_state.upload_results, st.session_state.upload_unreadable
+
+    total = count_uploads(files)
+    progress = st.progress(0.0, text=f"Processing {total} uploaded transcripts...")
+
+    def on_progress(done):
+        progress.progress(min(done / total, 1.0), text=f"Processed {done} of {total} uploaded transcripts")
+
+    unreadable = []
+    results = count_transcripts(
+        iter_uploads(files),
+        frozenset(extra_stop_words),
+        max_n,
+        max_terms,
+        on_progress=on_progress,
+        language=language,
+        unreadable=unreadable
+    )
+    progress.empty()
+
+    st.session_state.upload_signature = signature
+    st.session_state.upload_results = results
+    st.session_state.upload_unreadable = unreadable
+    return results, unreadable
+
+def counting_caption(stats, show_language):
+    """Describe how a script was counted, and in which language if it was detected."""
+    caption = f"Counting: {stats['mode']}, ~{stats['memory_bytes'] / 1024:.1f} KB of memory"
+    if show_language:
+        caption += f", detected language: {LANGUAGE_NAMES.get(stats['language'], stats['language'])}"
+    return caption
 
 # Set page configuration
 st.set_page_config(
@@ -197,6 +177,14 @@ for i, tab in enumerate(script_tabs):
         script_text = st.text_area(script_label, height=150, key=f"script_{i}")
         script_texts.append(script_text)
 
+# Bulk upload for more scripts than the tabs above can hold
+uploaded_files = st.file_uploader(
+    "Or upload transcript files (.txt, .srt, .vtt or .json, or a .zip of them)",
+    type=["txt", "srt", "vtt", "json", "zip"],
+    accept_multiple_files=True,
+    help="Timestamps and caption cue numbers are removed automatically"
+)
+
 # Analysis settings
 st.header("Analysis Settings")
 col1, col2 = st.columns(2)
@@ -209,40 +197,130 @@ with col2:
     min_scripts_for_common = 2
     st.number_input("Minimum scripts for common keywords", 
                     min_value=2, 
-                    max_value=10,
+                    max_value=1000,
                     value=2,
                     key="min_scripts")
 
+extra_stop_words = st.text_input("Additional stop words (comma separated)",
+                                 help="Words to ignore on top of the built-in stop word list")
+extra_stop_words = tuple(sorted(parse_stop_words(extra_stop_words)))
+
+language_labels = {name: code for code, name in LANGUAGE_NAMES.items()}
+language_labels["Detect for each script"] = "auto"
+language = language_labels[st.selectbox(
+    "Transcript language",
+    list(language_labels),
+    help="Chooses the stop word list; detection guesses each script's language from common words"
+)]
+
+col3, col4 = st.columns(2)
+
+with col3:
+    max_n = st.slider("Longest phrase to count (words)", min_value=1, max_value=3, value=1,
+                      help="Count phrases such as \"machine learning\" as well as single words")
+
+with col4:
+    max_terms = st.number_input("Track only the top N terms (0 = exact counts)", min_value=0, value=0, step=1000,
+                                help="Bounds memory on very long transcripts; counts become approximate upper bounds") or None
+
+sort_labels = {
+    "Occurrences": "count",
+    "TF-IDF": "tfidf",
+    "BM25": "bm25",
+    "Keyness (log-likelihood)": "keyness"
+}
+sort_by = sort_labels[st.selectbox(
+    "Sort each script's keywords by",
+    list(sort_labels),
+    help="Distinctiveness scores compare each script against the other scripts you have loaded"
+)]
+
+col5, col6 = st.columns(2)
+
+with col5:
+    collapse_duplicates = st.checkbox("Collapse near-duplicate scripts",
+                                      help="Count re-uploads, clips and compilations of a script only once, "
+                                           "so they don't inflate the common keywords")
+
+with col6:
+    duplicate_threshold = st.slider("Near-duplicate similarity", min_value=0.5, max_value=1.0, value=0.8, step=0.05,
+                                    disabled=not collapse_duplicates,
+                                    help="Estimated share of three-word phrases two scripts must have in common")
+
 # Submit button in its own row
 submitted = st.button("Analyze All Scripts", type="primary")
 
-# Process scripts when the button is clicked
+# Keep showing results after the first click, so changing a threshold
+# re-filters the cached counts instead of hiding the analysis
 if submitted:
+    st.session_state.analyzed = True
+
+# Process scripts once the button has been clicked
+if st.session_state.get("analyzed"):
     # Filter out empty scripts
     valid_scripts = [s for s in script_texts if s.strip()]
     
-    if not valid_scripts:
+    if not valid_scripts and not uploaded_files:
         st.error("Please enter at least one script to analyze.")
     else:
         # Analyze each script
         all_results = []
         all_keyword_counts = []
         
+        script_hashes = [hashlib.sha256(script.encode('utf-8')).hexdigest() for script in valid_scripts]
+        counted_scripts = [
+            (f"Script {i + 1}", word_counts, word_count, stats)
+            for i, (word_counts, word_count, stats) in enumerate(
+                count_pasted_scripts(valid_scripts, script_hashes, extra_stop_words, max_n, max_terms, language)
+            )
+        ]
+        minhashes = []
+        if collapse_duplicates:
+            minhashes = [script_minhash(script_hash, script) for script_hash, script in zip(script_hashes, valid_scripts)]
+        
+        if uploaded_files:
+            counted_uploads, unreadable = count_uploaded_files(uploaded_files, extra_stop_words, max_n, max_terms, language)
+            counted_scripts.extend(counted_uploads)
+            if unreadable:
+                listed = ", ".join(unreadable[:20])
+                if len(unreadable) > 20:
+                    listed += f" and {len(unreadable) - 20} more"
+                st.warning(f"Could not read {listed}")
+            if collapse_duplicates:
+                minhashes.extend(upload_minhashes(uploaded_files))
+        
+        if collapse_duplicates:
+            counted_scripts, collapsed = collapse_near_duplicates(counted_scripts, minhashes, duplicate_threshold)
+            if collapsed:
+                listed = "; ".join(f"{name} (~{score:.0%} like {original})" for name, original, score in collapsed[:20])
+                if len(collapsed) > 20:
+                    listed += f"; and {len(collapsed) - 20} more"
+                st.info(f"Collapsed {len(collapsed)} near-duplicate scripts: {listed}")
+        
         with st.spinner("Analyzing scripts..."):
-            for i, script in enumerate(valid_scripts):
-                keywords, word_counts = analyze_keywords(script, min_occurrences)
+            for name, word_counts, word_count, stats in counted_scripts:
+                keywords = frequent_words(word_counts, min_occurrences)
                 all_results.append({
-                    "script_num": i + 1,
+                    "name": name,
                     "keywords": keywords,
-                    "word_count": len(script.split())
+                    "word_count": word_count,
+                    "counting": stats
                 })
                 all_keyword_counts.append(word_counts)
             
+            # Rank each script's keywords by how distinctive they are against the other scripts
+            if sort_by != "count" and len(all_results) > 1:
+                scorer = KeywordScorer(all_keyword_counts)
+                for i, result in enumerate(all_results):
+                    scores = scorer.score(i, sort_by)
+                    result["keywords"] = sort_by_score(result["keywords"], scores)
+                    result["scores"] = {word: scores[word] for word in result["keywords"]}
+            
             # Get min_scripts_for_common from the number input
             min_scripts_for_common = st.session_state.min_scripts
             
             # Find common keywords across scripts
-            if len(valid_scripts) > 1:
+            if len(all_results) > 1:
                 common_keywords = find_common_keywords(
                     all_keyword_counts, 
                     min_scripts_for_common, 
@@ -252,8 +330,10 @@ if submitted:
                 common_keywords = {}
         
         # Display results in tabs
-        if len(valid_scripts) > 1:
-            result_tabs = st.tabs(["Common Keywords"] + [f"Script {i+1}" for i in range(len(valid_scripts))])
+        if not all_results:
+            st.error("No transcripts found to analyze. Uploads must be .txt, .srt, .vtt or .json files, or zip archives of them.")
+        elif len(all_results) > 1:
+            result_tabs = st.tabs(["Common Keywords"] + [result['name'] for result in all_results])
             
             # Tab for common keywords
             with result_tabs[0]:
@@ -297,7 +377,7 @@ if submitted:
             # Individual script tabs
             for i, result in enumerate(all_results):
                 with result_tabs[i+1]:
-                    st.header(f"Analysis for Script {result['script_num']}")
+                    st.header(f"Analysis for {result['name']}")
                     
                     if result['keywords']:
                         st.success(f"Found {len(result['keywords'])} keywords that appear at least {min_occurrences} times in a script of {result['word_count']} words.")
@@ -308,6 +388,8 @@ if submitted:
                             "Occurrences": list(result['keywords'].values()),
                             "Percentage": [f"{(count / result['word_count'] * 100):.2f}%" for count in result['keywords'].values()]
                         })
+                        if "scores" in result:
+                            keywords_df["Score"] = [round(score, 3) for score in result['scores'].values()]
                         
                         # Show bar chart
                         st.subheader("Top Keywords")
@@ -324,12 +406,16 @@ if submitted:
                         # Display full table
                         st.subheader("All Keywords")
                         st.dataframe(keywords_df, use_container_width=True)
+                        st.caption(counting_caption(result['counting'], language == "auto"))
                     else:
                         st.warning(f"No keywords found that appear at least {min_occurrences} times. Try lowering the minimum occurrences.")
         else:
             # Single script analysis
             result = all_results[0]
             
+            if sort_by != "count":
+                st.info("Distinctiveness scores need at least two scripts to compare, so keywords are sorted by occurrences.")
+            
             if result['keywords']:
                 st.success(f"Found {len(result['keywords'])} keywords that appear at least {min_occurrences} times in a script of {result['word_count']} words.")
                 
@@ -339,6 +425,8 @@ if submitted:
                     "Occurrences": list(result['keywords'].values()),
                     "Percentage": [f"{(count / result['word_count'] * 100):.2f}%" for count in result['keywords'].values()]
                 })
+                if "scores" in result:
+                    keywords_df["Score"] = [round(score, 3) for score in result['scores'].values()]
                 
                 # Show bar chart
                 st.subheader("Top Keywords")
@@ -355,6 +443,7 @@ if submitted:
                 # Display full table
                 st.subheader("All Keywords")
                 st.dataframe(keywords_df, use_container_width=True)
+                st.caption(counting_caption(result['counting'], language == "auto"))
                 
                 # Download option
                 st.download_button(
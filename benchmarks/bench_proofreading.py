@@ -0,0 +1,90 @@
+"""Compare the old string-splicing correction path with the single-pass engine.
+
+Run with: python benchmarks/bench_proofreading.py [--words N] [--every K]
+"""
+import os
+import sys
+import argparse
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from proofreading import apply_corrections, proofread
+
+WORDS = ['teh', 'video', 'machine', 'learning', 'is', 'realy', 'great', 'and', 'we', 'recieve',
+         'lots', 'of', 'questions', 'about', 'neural', 'networks', 'today']
+
+class StubMatch:
+    def __init__(self, offset, error_length, replacement):
+        self.offset = offset
+        self.errorLength = error_length
+        self.replacements = [replacement]
+
+class StubChecker:
+    """Stands in for LanguageTool by flagging every k-th word."""
+
+    def __init__(self, every):
+        self.every = every
+
+    def check(self, text):
+        return make_matches(text, self.every)
+
+def make_transcript(word_count, seed=0):
+    """Build a synthetic transcript with a sentence break roughly every 15 words."""
+    rng = random.Random(seed)
+    words = []
+    for i in range(word_count):
+        word = rng.choice(WORDS)
+        words.append(word + '.' if i % 15 == 14 else word)
+    return ' '.join(words)
+
+def make_matches(text, every):
+    """Create one stub match for every k-th word of the text."""
+    matches = []
+    offset = 0
+    for i, word in enumerate(text.split(' ')):
+        if i % every == 0:
+            matches.append(StubMatch(offset, len(word), word.upper()))
+        offset += len(word) + 1
+    return matches
+
+def splice_corrections(text, matches):
+    """The original proofread_text correction loop, kept for comparison."""
+    corrected_text = text
+    offset = 0
+    for match in sorted(matches, key=lambda m: m.offset):
+        if match.replacements:
+            replacement = match.replacements[0]
+            start = match.offset + offset
+            end = match.offset + match.errorLength + offset
+            corrected_text = corrected_text[:start] + replacement + corrected_text[end:]
+            offset += len(replacement) - match.errorLength
+    return corrected_text
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transcript correction paths')
+    parser.add_argument('--words', type=int, default=100000, help='Words in the synthetic transcript (default: 100000)')
+    parser.add_argument('--every', type=int, default=10, help='Flag every k-th word as an error (default: 10)')
+    args = parser.parse_args()
+
+    text = make_transcript(args.words)
+    matches = make_matches(text, args.every)
+    print(f"Transcript: {args.words} words, {len(text)} chars, {len(matches)} matches")
+
+    old, old_time = timed(splice_corrections, text, matches)
+    new, new_time = timed(apply_corrections, text, matches)
+    (chunked, _), chunked_time = timed(proofread, StubChecker(args.every), text)
+
+    assert old == new, 'single-pass output differs from splicing output'
+    print(f"splice (old):        {old_time:.3f}s")
+    print(f"single pass (new):   {new_time:.3f}s  ({old_time / new_time:.0f}x faster)")
+    print(f"chunked proofread:   {chunked_time:.3f}s  (includes stub checking)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Measure keyword tokenizing and counting throughput in tokens/sec on multi-MB text.
+
+Run with: python benchmarks/bench_tokenizer.py [--mb N]
+"""
+import os
+import sys
+import argparse
+import random
+import re
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keywords import STOP_WORDS, count_words
+
+VOCABULARY = ['machine', 'learning', 'the', 'and', 'don\'t', 'neural', 'network', 'video', 'it\'s',
+              'python', 'data', 'model', 'training', 'really', 'just', 'so', 'gradient', 'descent']
+
+def make_text(megabytes, seed=0):
+    """Build synthetic transcript text of roughly the given size."""
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        word = rng.choice(VOCABULARY)
+        if rng.random() < 0.05:
+            word = word.capitalize() + ','
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)
+
+def count_words_old(text):
+    """The original analyze_keywords counting path, kept for comparison."""
+    stop_words = set(STOP_WORDS)  # stands in for rebuilding the set literal on every call
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    words = text.split()
+    filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
+    return Counter(filtered_words)
+
+def measure(func, text, token_count):
+    start = time.perf_counter()
+    func(text)
+    elapsed = time.perf_counter() - start
+    return elapsed, token_count / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark keyword tokenizing and counting')
+    parser.add_argument('--mb', type=float, default=8, help='Size of the synthetic text in MB (default: 8)')
+    args = parser.parse_args()
+
+    text = make_text(args.mb)
+    token_count = len(text.split())
+    print(f"Text: {len(text) / 1024 / 1024:.1f} MB, {token_count} tokens")
+
+    for name, func in (('re.sub + split (old)', count_words_old), ('precompiled findall (new)', count_words)):
+        elapsed, rate = measure(func, text, token_count)
+        print(f"{name:28} {elapsed:.3f}s  {rate / 1e6:.2f}M tokens/sec")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""Benchmark suite for the tokenizing, counting and proofreading hot paths.
+
+Times keyword analysis on synthetic transcripts of 1k, 100k and 1M words,
+counting them split over eight scripts serially and across a process pool,
+common keyword search and near-duplicate detection over 10, 100 and 1000
+scripts, proofread_text with a stub LanguageTool, with and without a warm
+sentence cache, and CLI startup, then writes the timings to JSON so runs from
+different commits can be compared.
+
+Run with: python benchmarks/run_benchmarks.py [-o results.json] [--compare old.json]
+          [--profile cprofile|tracemalloc] [--only NAME]
+"""
+import os
+import sys
+import argparse
+import cProfile
+import importlib.util
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus_index import CorpusIndex, find_common_keywords
+from keywords import STOP_WORDS, analyze_keywords, count_terms, frequent_words
+from parallel_counting import count_script, count_scripts
+from bench_proofreading import StubChecker
+
+# Modules the CLI must not import unless a command needs them
+HEAVY_MODULES = ('pytube', 'youtube_transcript_api', 'language_tool_python', 'asyncio', 'numpy', 'sqlite3',
+                 'concurrent.futures')
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'ta', 'shi', 'ven', 'dor', 'pla', 'gri', 'son', 'tek', 'mar']
+
+def make_vocabulary(size=5000, seed=0):
+    """Build distinct made-up content words mixed with real stop words."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    vocabulary = sorted(STOP_WORDS)[:100] + sorted(words)
+    rng.shuffle(vocabulary)
+    return vocabulary
+
+def make_transcript(word_count, seed=0, vocabulary=None):
+    """Build a synthetic transcript with Zipf-distributed words and a sentence break every ~15 words."""
+    rng = random.Random(seed)
+    vocabulary = vocabulary or make_vocabulary()
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    words = rng.choices(vocabulary, weights, k=word_count)
+    for i in range(14, word_count, 15):
+        words[i] += '.'
+    return ' '.join(words)
+
+@lru_cache(maxsize=4)
+def cached_transcript(word_count):
+    """Return the same synthetic transcript to every case of a given size."""
+    return make_transcript(word_count)
+
+def make_scripts(script_count, words_per_script=2000, seed=0):
+    """Return the word counts of script_count synthetic scripts."""
+    vocabulary = make_vocabulary()
+    return [
+        count_terms(make_transcript(words_per_script, seed + i, vocabulary), STOP_WORDS)
+        for i in range(script_count)
+    ]
+
+@lru_cache(maxsize=1)
+def load_transcriber():
+    """Import YouTubeTranscriber from youtube-transcriber.py, whose name is not importable."""
+    spec = importlib.util.spec_from_file_location('youtube_transcriber', os.path.join(ROOT, 'youtube-transcriber.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.YouTubeTranscriber
+
+def build_cases(sizes, script_counts):
+    """Return (name, params, setup) for every benchmark; setup returns the function to time."""
+    cases = []
+
+    for words in sizes:
+        def keywords_module(words=words):
+            text = cached_transcript(words)
+            return lambda: analyze_keywords(text, 3)
+
+        def keywords_app(words=words):
+            text = cached_transcript(words)
+            return lambda: frequent_words(count_terms(text, STOP_WORDS), 3)
+
+        def keywords_cli(words=words):
+            text = cached_transcript(words)
+            transcriber = load_transcriber()(proofread=False)
+            return lambda: transcriber.analyze_keywords(text, 3)
+
+        def keywords_phrases(words=words):
+            text = cached_transcript(words)
+            return lambda: analyze_keywords(text, 3, max_n=3)
+
+        def keywords_top_k(words=words):
+            text = cached_transcript(words)
+            return lambda: analyze_keywords(text, 3, max_terms=1000)
+
+        cases += [
+            ('analyze_keywords', {'variant': 'keywords', 'words': words}, keywords_module),
+            ('analyze_keywords', {'variant': 'app', 'words': words}, keywords_app),
+            ('analyze_keywords', {'variant': 'cli', 'words': words}, keywords_cli),
+            ('analyze_keywords', {'variant': 'ngrams-3', 'words': words}, keywords_phrases),
+            ('analyze_keywords', {'variant': 'top-1000', 'words': words}, keywords_top_k),
+        ]
+
+    for words in sizes:
+        # The same words spread over eight scripts, as pasted into the app
+        def scripts_serial(words=words):
+            texts = [make_transcript(words // 8, seed) for seed in range(8)]
+            return lambda: [count_script(text) for text in texts]
+
+        def scripts_pool(words=words):
+            texts = [make_transcript(words // 8, seed) for seed in range(8)]
+            return lambda: count_scripts(texts)
+
+        cases += [
+            ('count_scripts', {'variant': 'serial', 'words': words}, scripts_serial),
+            ('count_scripts', {'variant': 'pool', 'words': words}, scripts_pool),
+        ]
+
+    for scripts in script_counts:
+        def common_index(scripts=scripts):
+            documents = make_scripts(scripts)
+            return lambda: find_common_keywords(documents, max(2, scripts // 5), 3)
+
+        def common_matrix(scripts=scripts):
+            matrix = CorpusIndex(make_scripts(scripts)).to_matrix()
+            return lambda: matrix.common_keywords(max(2, scripts // 5), 3)
+
+        def duplicates_lsh(scripts=scripts):
+            # NumPy is only needed by this case, so the others still run without it
+            from near_duplicates import NearDuplicateFilter
+
+            vocabulary = make_vocabulary()
+            texts = [make_transcript(2000, i, vocabulary) for i in range(scripts)]
+
+            def run():
+                duplicates = NearDuplicateFilter()
+                return [duplicates.check(i, text) for i, text in enumerate(texts)]
+            return run
+
+        cases += [
+            ('find_common_keywords', {'variant': 'index', 'scripts': scripts}, common_index),
+            ('find_common_keywords', {'variant': 'matrix', 'scripts': scripts}, common_matrix),
+            ('near_duplicates', {'variant': 'lsh', 'scripts': scripts}, duplicates_lsh),
+        ]
+
+    for words in sizes:
+        def proofread_stub(words=words):
+            text = cached_transcript(words)
+            transcriber = load_transcriber()(proofread=False)
+            transcriber.language_tool = StubChecker(10)
+            return lambda: transcriber.proofread_text(text, True)
+
+        def proofread_cached(words=words):
+            # sqlite3 is only needed by this case, so the others still run without it
+            from proofread_cache import ProofreadCache
+
+            text = cached_transcript(words)
+            transcriber = load_transcriber()(proofread=False, proofread_cache=ProofreadCache(':memory:'))
+            transcriber.language_tool = StubChecker(10)
+            # The warm-up run fills the sentence cache, so the timed runs measure reuse
+            return lambda: transcriber.proofread_text(text, True)
+
+        cases += [
+            ('proofread_text', {'variant': 'stub', 'words': words}, proofread_stub),
+            ('proofread_text', {'variant': 'sentence-cache', 'words': words}, proofread_cached),
+        ]
+
+    script = os.path.join(ROOT, 'youtube-transcriber.py')
+
+    def startup_import():
+        # Fails the run if loading the CLI module pulls in a heavy dependency
+        code = (f"import importlib.util, sys; sys.path.insert(0, {ROOT!r}); "
+                f"spec = importlib.util.spec_from_file_location('youtube_transcriber', {script!r}); "
+                f"spec.loader.exec_module(importlib.util.module_from_spec(spec)); "
+                f"loaded = sorted(set({HEAVY_MODULES!r}) & set(sys.modules)); "
+                f"assert not loaded, f'imported at startup: {{loaded}}'")
+        return lambda: subprocess.run([sys.executable, '-c', code], check=True)
+
+    def startup_analyze():
+        return lambda: subprocess.run([sys.executable, script, 'analyze', '-'], input=b'machine learning ' * 1000,
+                                      stdout=subprocess.DEVNULL, check=True)
+
+    cases += [
+        ('startup', {'command': 'import'}, startup_import),
+        ('startup', {'command': 'analyze'}, startup_analyze),
+    ]
+
+    return cases
+
+def case_id(name, params):
+    return name + '[' + ','.join(f"{key}={value}" for key, value in params.items()) + ']'
+
+def time_case(func, repeat):
+    """Run func repeat times and return the wall times in seconds."""
+    func()  # warm up caches and lazy imports
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+def profile_case(func, mode, path):
+    """Run func once more under cProfile or tracemalloc and dump the profile to path."""
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.runcall(func)
+        profiler.dump_stats(path + '.prof')
+        return {}
+
+    tracemalloc.start()
+    try:
+        func()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    with open(path + '.tracemalloc.txt', 'w', encoding='utf-8') as f:
+        f.write(f"Peak traced memory: {peak} bytes\n\n")
+        for stat in snapshot.statistics('lineno')[:25]:
+            f.write(f"{stat}\n")
+    return {'peak_bytes': peak}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path, threshold):
+    """Print each case's median against a baseline results file and return the regressed cases."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {result['id']: result for result in json.load(f)['results']}
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} ({threshold:.0%} threshold):")
+    for result in results:
+        old = baseline.get(result['id'])
+        if old is None:
+            continue
+        ratio = result['median'] / old['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(result['id'])
+        print(f"  {result['id']:55} {old['median'] * 1000:10.2f}ms -> {result['median'] * 1000:10.2f}ms  x{ratio:.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the keyword and proofreading benchmark suite')
+    parser.add_argument('-o', '--output', help='Write results to this JSON file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--sizes', default='1000,100000,1000000',
+                        help='Comma-separated transcript sizes in words (default: 1000,100000,1000000)')
+    parser.add_argument('--scripts', default='10,100,1000',
+                        help='Comma-separated script counts for find_common_keywords (default: 10,100,1000)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timed runs per case (default: 3)')
+    parser.add_argument('--only', help='Only run cases whose ID contains this text')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare medians with an earlier results file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Slowdown reported as a regression by --compare (default: 0.1 = 10%%)')
+    parser.add_argument('--profile', choices=['cprofile', 'tracemalloc'],
+                        help='Also run every case once under cProfile or tracemalloc and dump the profiles')
+    parser.add_argument('--profile-dir', default=os.path.join(ROOT, 'benchmarks', 'profiles'),
+                        help='Directory for profile dumps (default: benchmarks/profiles)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    script_counts = [int(count) for count in args.scripts.split(',')]
+    if args.profile:
+        os.makedirs(args.profile_dir, exist_ok=True)
+
+    results = []
+    for name, params, setup in build_cases(sizes, script_counts):
+        identifier = case_id(name, params)
+        if args.only and args.only not in identifier:
+            continue
+
+        try:
+            func = setup()
+        except ImportError as e:
+            print(f"{identifier:55} skipped: {e}", file=sys.stderr)
+            continue
+
+        times = time_case(func, args.repeat)
+        result = {
+            'id': identifier,
+            'name': name,
+            'params': params,
+            'times': times,
+            'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.mean(times)
+        }
+        if 'words' in params:
+            result['words_per_sec'] = params['words'] / result['median']
+        if args.profile:
+            result.update(profile_case(func, args.profile, os.path.join(args.profile_dir, identifier)))
+
+        results.append(result)
+        rate = f"  {result['words_per_sec'] / 1e6:8.2f}M words/sec" if 'words_per_sec' in result else ''
+        print(f"{identifier:55} {result['median'] * 1000:10.2f}ms{rate}")
+
+    commit = git_commit()
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'commit': commit,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'results': results
+        }, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
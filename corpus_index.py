@@ -0,0 +1,111 @@
+class CorpusIndex:
+    """Inverted index mapping each term to its per-document counts.
+
+    Documents are word Counters (or any term -> count mapping) and are
+    numbered in the order they are added. Each term keeps a postings list of
+    (document number, count) pairs, so corpus-wide queries only touch the
+    postings of the terms they look at instead of scanning every document.
+    """
+
+    def __init__(self, documents=()):
+        self.postings = {}
+        self.document_count = 0
+        for word_counts in documents:
+            self.add_document(word_counts)
+
+    def add_document(self, word_counts):
+        """Add one document's word counts and return its document number."""
+        doc_id = self.document_count
+        self.document_count += 1
+
+        for word, count in word_counts.items():
+            if count:
+                self.postings.setdefault(word, []).append((doc_id, count))
+
+        return doc_id
+
+    def common_keywords(self, min_scripts, min_occurrences):
+        """Find keywords that appear in at least min_scripts documents with min_occurrences each.
+
+        Returns a dict of keyword -> total occurrences across all documents,
+        sorted by total frequency.
+        """
+        common_keywords = {}
+        for word, postings in self.postings.items():
+            # A word in fewer documents than min_scripts can never qualify
+            if len(postings) < min_scripts:
+                continue
+
+            script_count = 0
+            total_count = 0
+            for _, count in postings:
+                total_count += count
+                if count >= min_occurrences:
+                    script_count += 1
+
+            if script_count >= min_scripts:
+                common_keywords[word] = total_count
+
+        return dict(sorted(common_keywords.items(), key=lambda item: item[1], reverse=True))
+
+    def to_matrix(self):
+        """Return the index as a sparse DocumentTermMatrix."""
+        return DocumentTermMatrix.from_index(self)
+
+class DocumentTermMatrix:
+    """Sparse term-by-document count matrix in compressed sparse row layout.
+
+    Row ``i`` holds the postings of ``vocabulary[i]``: its document numbers
+    are ``indices[indptr[i]:indptr[i + 1]]`` and its counts are the same
+    slice of ``data``, as in a SciPy ``csr_matrix``. Threshold queries run as
+    NumPy reductions over all postings at once.
+    """
+
+    def __init__(self, vocabulary, data, indices, indptr, document_count):
+        self.vocabulary = vocabulary
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.document_count = document_count
+
+    @classmethod
+    def from_index(cls, index):
+        import numpy as np
+
+        vocabulary = list(index.postings)
+        lengths = np.fromiter((len(index.postings[word]) for word in vocabulary), dtype=np.int64, count=len(vocabulary))
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        data = np.empty(indptr[-1], dtype=np.int64)
+        for row, word in enumerate(vocabulary):
+            postings = index.postings[word]
+            start = indptr[row]
+            indices[start:start + len(postings)] = [doc_id for doc_id, _ in postings]
+            data[start:start + len(postings)] = [count for _, count in postings]
+
+        return cls(vocabulary, data, indices, indptr, index.document_count)
+
+    def common_keywords(self, min_scripts, min_occurrences):
+        """Vectorized equivalent of CorpusIndex.common_keywords."""
+        import numpy as np
+
+        if not self.vocabulary:
+            return {}
+
+        # Every row has at least one posting, so reduceat sums each row exactly
+        starts = self.indptr[:-1]
+        script_counts = np.add.reduceat((self.data >= min_occurrences).astype(np.int64), starts)
+        totals = np.add.reduceat(self.data, starts)
+
+        rows = np.flatnonzero(script_counts >= min_scripts)
+        rows = rows[np.argsort(-totals[rows], kind='stable')]
+        return {self.vocabulary[row]: int(totals[row]) for row in rows}
+
+def find_common_keywords(all_keyword_counts, min_scripts, min_occurrences):
+    """Find keywords that appear in multiple scripts with minimum occurrences."""
+    if not all_keyword_counts:
+        return {}
+
+    return CorpusIndex(all_keyword_counts).common_keywords(min_scripts, min_occurrences)
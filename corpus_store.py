@@ -0,0 +1,187 @@
+import os
+import sqlite3
+import threading
+import time
+
+TREND_PERIODS = {
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+    'year': '%Y'
+}
+
+class CorpusStore:
+    """Local SQLite database of per-video term counts for channel-level keyword tracking.
+
+    Each video's word counts are stored once, together with running per-term
+    aggregates (document frequency and total occurrences) that are updated
+    as videos are added or replaced. Corpus-wide questions are answered from
+    the stored counts with SQL, without re-tokenizing any transcript.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA foreign_keys = ON;
+            CREATE TABLE IF NOT EXISTS videos (
+                id INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL UNIQUE,
+                title TEXT,
+                channel TEXT,
+                published TEXT,
+                word_count INTEGER NOT NULL DEFAULT 0,
+                added REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS videos_channel ON videos (channel, published);
+            CREATE TABLE IF NOT EXISTS terms (
+                id INTEGER PRIMARY KEY,
+                term TEXT NOT NULL UNIQUE,
+                documents INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS term_counts (
+                video INTEGER NOT NULL REFERENCES videos (id) ON DELETE CASCADE,
+                term INTEGER NOT NULL REFERENCES terms (id),
+                count INTEGER NOT NULL,
+                PRIMARY KEY (video, term)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS term_counts_term ON term_counts (term, count);
+        """)
+        self._conn.commit()
+
+    def video_ids(self):
+        """Return the set of stored video IDs."""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT video_id FROM videos")}
+
+    def add_video(self, video_id, word_counts, title=None, channel=None, published=None, word_count=0):
+        """Store a video's word counts, replacing any earlier counts for the same video.
+
+        ``published`` is an ISO date string (or datetime/date) used for trends.
+        """
+        if hasattr(published, 'isoformat'):
+            published = published.isoformat()
+
+        with self._lock, self._conn:
+            self._remove(video_id)
+
+            cursor = self._conn.execute(
+                "INSERT INTO videos (video_id, title, channel, published, word_count, added) VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, title, channel, published, word_count, time.time())
+            )
+            video = cursor.lastrowid
+
+            items = [(term, count) for term, count in word_counts.items() if count > 0]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO terms (term) VALUES (?)",
+                ((term,) for term, _ in items)
+            )
+            self._conn.executemany(
+                "INSERT INTO term_counts (video, term, count) SELECT ?, id, ? FROM terms WHERE term = ?",
+                ((video, count, term) for term, count in items)
+            )
+            self._conn.executemany(
+                "UPDATE terms SET documents = documents + 1, total = total + ? WHERE term = ?",
+                ((count, term) for term, count in items)
+            )
+
+    def _remove(self, video_id):
+        row = self._conn.execute("SELECT id FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        if row is None:
+            return
+
+        self._conn.execute("""
+            UPDATE terms SET
+                documents = documents - 1,
+                total = total - (SELECT count FROM term_counts WHERE video = ? AND term = terms.id)
+            WHERE id IN (SELECT term FROM term_counts WHERE video = ?)
+        """, (row[0], row[0]))
+        self._conn.execute("DELETE FROM videos WHERE id = ?", (row[0],))
+
+    def _channel_filter(self, channel):
+        if channel is None:
+            return "", ()
+        return " AND v.channel = ?", (channel,)
+
+    def top_terms(self, limit=50, channel=None):
+        """Return the most frequent terms as a dict of term -> total occurrences."""
+        with self._lock:
+            if channel is None:
+                rows = self._conn.execute(
+                    "SELECT term, total FROM terms WHERE total > 0 ORDER BY total DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("""
+                    SELECT t.term, SUM(c.count) AS total
+                    FROM term_counts c JOIN terms t ON t.id = c.term JOIN videos v ON v.id = c.video
+                    WHERE v.channel = ?
+                    GROUP BY c.term ORDER BY total DESC LIMIT ?
+                """, (channel, limit)).fetchall()
+        return dict(rows)
+
+    def common_keywords(self, min_videos, min_occurrences, channel=None):
+        """Find keywords that appear in at least min_videos videos with min_occurrences each.
+
+        Same result as corpus_index.find_common_keywords over every stored
+        video, sorted by total occurrences. Terms whose stored document
+        frequency is below min_videos are skipped before touching their counts.
+        """
+        where, params = self._channel_filter(channel)
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT t.term, SUM(c.count) AS total
+                FROM terms t JOIN term_counts c ON c.term = t.id JOIN videos v ON v.id = c.video
+                WHERE t.documents >= ?{where}
+                GROUP BY t.id
+                HAVING SUM(c.count >= ?) >= ?
+                ORDER BY total DESC
+            """, (min_videos, *params, min_occurrences, min_videos)).fetchall()
+        return dict(rows)
+
+    def term_trend(self, term, period='month', channel=None):
+        """Return a term's use per period of publish date.
+
+        Each entry has the number of videos published in the period, how many
+        mention the term, its occurrences, and occurrences per 1,000 words.
+        """
+        where, params = self._channel_filter(channel)
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT strftime(?, v.published) AS period,
+                       COUNT(*) AS videos,
+                       COUNT(c.count) AS mentions,
+                       COALESCE(SUM(c.count), 0) AS occurrences,
+                       SUM(v.word_count) AS words
+                FROM videos v
+                LEFT JOIN term_counts c ON c.video = v.id AND c.term = (SELECT id FROM terms WHERE term = ?)
+                WHERE v.published IS NOT NULL{where}
+                GROUP BY period ORDER BY period
+            """, (TREND_PERIODS[period], term, *params)).fetchall()
+
+        return [
+            {
+                'period': period_label,
+                'videos': videos,
+                'videos_mentioning': mentions,
+                'occurrences': occurrences,
+                'per_1000_words': round(occurrences * 1000 / words, 3) if words else None
+            }
+            for period_label, videos, mentions, occurrences, words in rows
+        ]
+
+    def stats(self):
+        with self._lock:
+            videos, channels, first, last = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT channel), MIN(published), MAX(published) FROM videos"
+            ).fetchone()
+            terms = self._conn.execute("SELECT COUNT(*) FROM terms WHERE documents > 0").fetchone()[0]
+        return {'videos': videos, 'channels': channels, 'terms': terms, 'first_published': first, 'last_published': last}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
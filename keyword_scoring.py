@@ -0,0 +1,142 @@
+import json
+import numpy as np
+
+SCORING_METHODS = ('count', 'tfidf', 'bm25', 'keyness')
+
+# Standard BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+class BackgroundCorpus:
+    """Document frequencies and term counts of a reference corpus, stored as JSON.
+
+    A background corpus lets a single transcript be scored against previously
+    analyzed videos instead of only the scripts loaded alongside it.
+    """
+
+    def __init__(self, documents=0, total_terms=0, document_frequencies=None, term_counts=None):
+        self.documents = documents
+        self.total_terms = total_terms
+        self.document_frequencies = document_frequencies or {}
+        self.term_counts = term_counts or {}
+
+    def add_document(self, word_counts):
+        """Add one document's word counts to the corpus."""
+        self.documents += 1
+        for word, count in word_counts.items():
+            self.document_frequencies[word] = self.document_frequencies.get(word, 0) + 1
+            self.term_counts[word] = self.term_counts.get(word, 0) + count
+            self.total_terms += count
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['documents'], data['total_terms'], data['document_frequencies'], data['term_counts'])
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'documents': self.documents,
+                'total_terms': self.total_terms,
+                'document_frequencies': self.document_frequencies,
+                'term_counts': self.term_counts
+            }, f, ensure_ascii=False)
+
+class KeywordScorer:
+    """Scores the words of each document against the rest of the corpus.
+
+    All documents share one vocabulary index. Each document is stored as an
+    array of vocabulary columns and an array of counts, and document
+    frequencies and corpus totals are computed with np.bincount. Scores for
+    a document are then whole-array expressions over its own columns, with
+    no per-word Python loops.
+    """
+
+    def __init__(self, documents, background=None):
+        self.vocabulary = {}
+        self.words = []
+        self.doc_columns = []
+        self.doc_counts = []
+
+        for word_counts in documents:
+            columns = np.fromiter((self._column(word) for word in word_counts), dtype=np.int64, count=len(word_counts))
+            counts = np.fromiter(word_counts.values(), dtype=np.float64, count=len(word_counts))
+            self.doc_columns.append(columns)
+            self.doc_counts.append(counts)
+
+        size = len(self.words)
+        all_columns = np.concatenate(self.doc_columns) if self.doc_columns else np.zeros(0, dtype=np.int64)
+        all_counts = np.concatenate(self.doc_counts) if self.doc_counts else np.zeros(0)
+
+        self.document_frequencies = np.bincount(all_columns, minlength=size).astype(np.float64)
+        self.term_totals = np.bincount(all_columns, weights=all_counts, minlength=size)
+        self.doc_lengths = np.array([counts.sum() for counts in self.doc_counts])
+        self.document_count = len(self.doc_counts)
+        self.total_terms = float(self.doc_lengths.sum())
+
+        # Fold the background corpus into the same vocabulary index
+        if background is not None:
+            self.document_frequencies += np.array([background.document_frequencies.get(word, 0) for word in self.words], dtype=np.float64)
+            self.term_totals += np.array([background.term_counts.get(word, 0) for word in self.words], dtype=np.float64)
+            self.document_count += background.documents
+            self.total_terms += background.total_terms
+
+    def _column(self, word):
+        column = self.vocabulary.get(word)
+        if column is None:
+            column = self.vocabulary[word] = len(self.words)
+            self.words.append(word)
+        return column
+
+    def tfidf(self, doc_index):
+        """Term frequency times smoothed inverse document frequency."""
+        columns, counts = self.doc_columns[doc_index], self.doc_counts[doc_index]
+        idf = np.log((1 + self.document_count) / (1 + self.document_frequencies[columns])) + 1
+        return counts / max(self.doc_lengths[doc_index], 1) * idf
+
+    def bm25(self, doc_index):
+        """Okapi BM25 weight of each term in the document."""
+        columns, counts = self.doc_columns[doc_index], self.doc_counts[doc_index]
+        df = self.document_frequencies[columns]
+        idf = np.log1p((self.document_count - df + 0.5) / (df + 0.5))
+        average_length = self.total_terms / max(self.document_count, 1)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_index] / max(average_length, 1))
+        return idf * counts * (BM25_K1 + 1) / (counts + norm)
+
+    def keyness(self, doc_index):
+        """Signed log-likelihood (G2) of each term in the document against the rest of the corpus.
+
+        Positive scores mark words the document uses more than the reference
+        corpus, negative scores words it uses less.
+        """
+        columns, counts = self.doc_columns[doc_index], self.doc_counts[doc_index]
+        doc_total = self.doc_lengths[doc_index]
+        reference = self.term_totals[columns] - counts
+        reference_total = self.total_terms - doc_total
+
+        if reference_total <= 0:
+            return np.zeros(len(counts))
+
+        expected_doc = doc_total * (counts + reference) / (doc_total + reference_total)
+        expected_reference = reference_total * (counts + reference) / (doc_total + reference_total)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            g2 = 2 * (counts * np.log(counts / expected_doc) +
+                      np.where(reference > 0, reference * np.log(reference / expected_reference), 0))
+
+        return np.where(counts / doc_total >= reference / reference_total, g2, -g2)
+
+    def score(self, doc_index, method):
+        """Return a dict of word -> score for every word in the document."""
+        if method == 'count':
+            scores = self.doc_counts[doc_index]
+        else:
+            scores = getattr(self, method)(doc_index)
+
+        words = self.words
+        return {words[column]: float(value) for column, value in zip(self.doc_columns[doc_index].tolist(), scores.tolist())}
+
+def sort_by_score(keywords, scores):
+    """Reorder a keyword -> count dict by descending score."""
+    return dict(sorted(keywords.items(), key=lambda item: scores.get(item[0], 0.0), reverse=True))
@@ -0,0 +1,322 @@
+import re
+import sys
+import heapq
+import unicodedata
+from collections import Counter, deque
+from operator import itemgetter
+
+# Comprehensive list of stop words to filter out, shared by the app and the CLI
+STOP_WORDS = frozenset({
+    # Articles
+    'a', 'an', 'the',
+
+    # Pronouns
+    'i', 'me', 'my', 'mine', 'myself',
+    'you', 'your', 'yours', 'yourself', 'yourselves',
+    'he', 'him', 'his', 'himself',
+    'she', 'her', 'hers', 'herself',
+    'it', 'its', 'itself',
+    'we', 'us', 'our', 'ours', 'ourselves',
+    'they', 'them', 'their', 'theirs', 'themselves',
+    'this', 'that', 'these', 'those', 'which', 'who', 'whom', 'what', 'whose',
+    'who\'s', 'what\'s', 'that\'s', 'there\'s', 'here\'s',
+
+    # Prepositions
+    'in', 'on', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 
+    'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to', 
+    'from', 'up', 'down', 'of', 'off', 'over', 'under', 'out',
+
+    # Conjunctions
+    'and', 'but', 'or', 'nor', 'so', 'yet', 'as', 'than', 'because', 'while',
+
+    # Common verbs
+    'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'shall', 'should',
+    'can', 'could', 'may', 'might', 'must', 'ought',
+    'go', 'goes', 'going', 'gone', 'went',
+    'come', 'comes', 'coming', 'came',
+    'get', 'gets', 'getting', 'got', 'gotten',
+    'make', 'makes', 'making', 'made',
+    'say', 'says', 'saying', 'said',
+    'know', 'knows', 'knowing', 'knew', 'known',
+    'think', 'thinks', 'thinking', 'thought',
+    'take', 'takes', 'taking', 'took', 'taken',
+    'see', 'sees', 'seeing', 'saw', 'seen',
+    'want', 'wants', 'wanting', 'wanted',
+    'look', 'looks', 'looking', 'looked',
+    'use', 'uses', 'using', 'used',
+    'tell', 'tells', 'telling', 'told',
+    'try', 'tries', 'trying', 'tried',
+    'ask', 'asks', 'asking', 'asked',
+    'need', 'needs', 'needing', 'needed',
+    'feel', 'feels', 'feeling', 'felt',
+    'become', 'becomes', 'becoming', 'became',
+    'leave', 'leaves', 'leaving', 'left',
+    'put', 'puts', 'putting',
+    'mean', 'means', 'meaning', 'meant',
+    'keep', 'keeps', 'keeping', 'kept',
+    'let', 'lets', 'letting',
+    'begin', 'begins', 'beginning', 'began', 'begun',
+    'seem', 'seems', 'seeming', 'seemed',
+    'help', 'helps', 'helping', 'helped',
+    'talk', 'talks', 'talking', 'talked',
+    'turn', 'turns', 'turning', 'turned',
+    'start', 'starts', 'starting', 'started',
+    'show', 'shows', 'showing', 'showed', 'shown',
+    'hear', 'hears', 'hearing', 'heard',
+    'play', 'plays', 'playing', 'played',
+    'run', 'runs', 'running', 'ran',
+    'move', 'moves', 'moving', 'moved',
+    'live', 'lives', 'living', 'lived',
+    'believe', 'believes', 'believing', 'believed',
+    'work', 'works', 'working', 'worked',
+    'happen', 'happens', 'happening', 'happened',
+    'done', 'doing', 'does', 
+
+    # Contractions
+    'isn\'t', 'aren\'t', 'wasn\'t', 'weren\'t', 'haven\'t', 'hasn\'t', 'hadn\'t',
+    'don\'t', 'doesn\'t', 'didn\'t', 'won\'t', 'wouldn\'t', 'can\'t', 'couldn\'t',
+    'shouldn\'t', 'mightn\'t', 'mustn\'t', 'they\'d', 'i\'d', 'we\'d', 'he\'d', 'she\'d',
+    'you\'d', 'i\'ll', 'you\'ll', 'he\'ll', 'she\'ll', 'we\'ll', 'they\'ll',
+    'i\'m', 'you\'re', 'he\'s', 'she\'s', 'it\'s', 'we\'re', 'they\'re',
+    'i\'ve', 'you\'ve', 'we\'ve', 'they\'ve',
+
+    # Adverbs
+    'very', 'really', 'just', 'now', 'then', 'here', 'there', 'when', 'where', 'why',
+    'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'some', 'such', 'no',
+    'not', 'only', 'same', 'so', 'than', 'too', 'well', 'again', 'ever', 'far',
+    'forward', 'fast', 'high', 'low', 'near', 'never', 'still', 'today',
+    'tomorrow', 'yesterday', 'almost', 'always', 'quickly', 'finally',
+
+    # Numbers as words
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+    'first', 'second', 'third', 'fourth', 'fifth', 'hundred', 'thousand', 'million',
+
+    # YouTube-specific common words
+    'like', 'subscribe', 'channel', 'video', 'comment', 'youtube', 'watch', 'click',
+    'today', 'gonna', 'let', 'tell', 'talk', 'show', 'thanks', 'thank',
+
+    # Additional words to filter based on user feedback
+    'out', 'told', 'while', 'wasn\'t', 'asked', 'they\'d', 'done', 'tried', 'back', 'even', 'other', 'wasnt', 'since', 'didnt', 'away', 'also', 'once', 'enough', 'much', 'dont', 'around', 'mrs', 'until'
+})
+
+# Words shorter than this are never counted as keywords
+MIN_WORD_LENGTH = 3
+
+# Characters read at a time when counting a text stream
+STREAM_CHUNK_CHARS = 1 << 20
+
+# A word is a run of word characters, optionally joined by apostrophes so
+# contractions like "don't" stay whole and can be matched against STOP_WORDS
+TOKEN_PATTERN = re.compile(r"\w+(?:['\u2019]\w+)*")
+
+# Words plus the punctuation that ends a phrase, for n-gram extraction,
+# including Spanish opening marks and the ellipsis character
+PHRASE_PATTERN = re.compile(r"\w+(?:['\u2019]\w+)*|[.!?;:,\u00bf\u00a1\u2026]")
+
+def fold(text):
+    """Lowercase the text, first composing accents into single characters.
+
+    \w does not match combining marks, so a decomposed "café" would
+    otherwise be split in two. ASCII text skips normalization.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize('NFC', text)
+    return text.lower()
+
+def normalize(word):
+    """Map typographic apostrophes to plain ones so contractions match STOP_WORDS."""
+    return word.replace('\u2019', "'") if '\u2019' in word else word
+
+def tokenize(text):
+    """Yield the lowercased words of the text in a single regex pass."""
+    for word in TOKEN_PATTERN.findall(fold(text)):
+        yield normalize(word)
+
+def count_words(text, stop_words=STOP_WORDS, min_length=MIN_WORD_LENGTH):
+    """Count the words of the text that are not stop words and at least min_length long.
+
+    Whitespace-separated chunks are counted first, which runs at C speed, and
+    the tokenizer regex is then applied once per distinct chunk rather than
+    once per occurrence. Words never span whitespace, so the counts are the
+    same as counting tokenize(text).
+    """
+    word_counts = Counter()
+    for chunk, count in Counter(fold(text).split()).items():
+        for word in TOKEN_PATTERN.findall(chunk):
+            word = normalize(word)
+            if len(word) >= min_length and word not in stop_words:
+                word_counts[word] += count
+    return word_counts
+
+def iter_terms(text, stop_words=STOP_WORDS, min_length=MIN_WORD_LENGTH, max_n=1):
+    """Yield every phrase of 1 to max_n consecutive keywords in the text.
+
+    Stop words, short words and punctuation end a phrase, so "machine
+    learning" is a term but "learning and teaching" never is.
+    """
+    return _iter_phrases(PHRASE_PATTERN.findall(fold(text)), stop_words, min_length, max_n)
+
+def _iter_phrases(words, stop_words, min_length, max_n):
+    window = deque(maxlen=max_n)
+    for word in words:
+        word = normalize(word)
+        if len(word) < min_length or word in stop_words:
+            window.clear()
+            continue
+
+        window.append(word)
+        yield word
+        for n in range(2, len(window) + 1):
+            yield ' '.join(list(window)[-n:])
+
+class TopKCounter:
+    """Approximate counter that keeps memory bounded to about 2 * capacity terms.
+
+    This is a batched Space-Saving sketch: once twice the capacity is being
+    tracked, only the capacity most frequent terms are kept. ``floor`` is the
+    highest count discarded so far. A term first seen afterwards starts from
+    ``floor``, so every reported count is an upper bound that overestimates
+    by at most ``floor``, and any term that truly occurs more than ``floor``
+    times is guaranteed to still be tracked.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.floor = 0
+        self.peak_bytes = 0
+
+    def update(self, terms):
+        counts = self.counts
+        limit = 2 * self.capacity
+        for term in terms:
+            if term in counts:
+                counts[term] += 1
+            else:
+                counts[term] = self.floor + 1
+                if len(counts) > limit:
+                    self._prune()
+                    counts = self.counts
+
+    def _prune(self):
+        self.peak_bytes = max(self.peak_bytes, estimate_memory(self.counts))
+        ranked = sorted(self.counts.items(), key=itemgetter(1), reverse=True)
+        self.floor = max(self.floor, ranked[self.capacity][1])
+        self.counts = dict(ranked[:self.capacity])
+
+    def most_common(self, n=None):
+        n = self.capacity if n is None else min(n, self.capacity)
+        return heapq.nlargest(n, self.counts.items(), key=itemgetter(1))
+
+    def to_counter(self):
+        """Return the top terms as a Counter."""
+        return Counter(dict(self.most_common()))
+
+    def memory_bytes(self):
+        return max(self.peak_bytes, estimate_memory(self.counts))
+
+def estimate_memory(counts):
+    """Approximate bytes held by a term -> count dict, including its keys and values."""
+    return sys.getsizeof(counts) + sum(sys.getsizeof(term) + sys.getsizeof(count) for term, count in counts.items())
+
+def count_terms(text, stop_words=STOP_WORDS, min_length=MIN_WORD_LENGTH, max_n=1, max_terms=None, stats=None):
+    """Count the keyword phrases of 1 to max_n words in the text.
+
+    With max_terms set, counting uses a TopKCounter that only keeps about
+    2 * max_terms phrases in memory and returns the max_terms most frequent,
+    with approximate counts. If a stats dict is given, it is filled with the
+    counting mode, the memory used and the approximation error bound.
+    """
+    if max_terms:
+        counter = TopKCounter(max_terms)
+        counter.update(iter_terms(text, stop_words, min_length, max_n))
+        counts = counter.to_counter()
+        if stats is not None:
+            stats.update(mode='top-k', memory_bytes=counter.memory_bytes(), error_bound=counter.floor)
+        return counts
+
+    if max_n == 1:
+        counts = count_words(text, stop_words, min_length)
+    else:
+        counts = Counter(iter_terms(text, stop_words, min_length, max_n))
+    if stats is not None:
+        stats.update(mode='exact', memory_bytes=estimate_memory(counts), error_bound=0)
+    return counts
+
+def iter_chunks(stream, chunk_chars=STREAM_CHUNK_CHARS):
+    """Read a text stream in pieces that end at whitespace, so no word is split between two.
+
+    The partial word at the end of each read is carried over to the next
+    piece; only a single word longer than chunk_chars makes a piece grow.
+    """
+    carry = ''
+    while True:
+        data = stream.read(chunk_chars)
+        if not data:
+            break
+        data = carry + data
+
+        end = len(data)
+        while end and not data[end - 1].isspace():
+            end -= 1
+        if not end:
+            carry = data
+            continue
+
+        carry = data[end:]
+        yield data[:end]
+
+    if carry:
+        yield carry
+
+def count_terms_stream(chunks, stop_words=STOP_WORDS, min_length=MIN_WORD_LENGTH, max_n=1, max_terms=None, stats=None):
+    """Count keyword phrases like count_terms, over text arriving in pieces from iter_chunks.
+
+    Only one piece is held at a time, so memory is bounded by the piece
+    size and the counts rather than the input. Phrases running across
+    piece boundaries are still counted, and the result is identical to
+    count_terms on the joined text, including the order of equal counts.
+    """
+    if max_terms or max_n > 1:
+        words = (word for chunk in chunks for word in PHRASE_PATTERN.findall(fold(chunk)))
+        terms = _iter_phrases(words, stop_words, min_length, max_n)
+        if max_terms:
+            counter = TopKCounter(max_terms)
+            counter.update(terms)
+            if stats is not None:
+                stats.update(mode='top-k', memory_bytes=counter.memory_bytes(), error_bound=counter.floor)
+            return counter.to_counter()
+        counts = Counter(terms)
+    else:
+        counts = Counter()
+        for chunk in chunks:
+            counts.update(count_words(chunk, stop_words, min_length))
+
+    if stats is not None:
+        stats.update(mode='exact', memory_bytes=estimate_memory(counts), error_bound=0)
+    return counts
+
+def frequent_words(word_counts, min_occurrences=3):
+    """Return the words counted at least min_occurrences times, most frequent first."""
+    frequent = [(word, count) for word, count in word_counts.items() if count >= min_occurrences]
+    frequent.sort(key=lambda item: item[1], reverse=True)
+    return dict(frequent)
+
+def analyze_keywords(text, min_occurrences=3, stop_words=STOP_WORDS, max_n=1, max_terms=None, stats=None):
+    """Analyze keywords that appear more than a specified number of times.
+
+    Returns the frequent keywords sorted by count together with the full
+    word counts. See count_terms for max_n, max_terms and stats.
+    """
+    word_counts = count_terms(text, stop_words, MIN_WORD_LENGTH, max_n, max_terms, stats)
+    return frequent_words(word_counts, min_occurrences), word_counts
+
+def parse_stop_words(text):
+    """Parse extra stop words separated by commas, whitespace or newlines."""
+    return frozenset(fold(word) for word in re.split(r'[,\s]+', text) if word)
+
+def load_stop_words(path, base=STOP_WORDS):
+    """Read extra stop words from a file and add them to base."""
+    with open(path, encoding='utf-8') as f:
+        return base | parse_stop_words(f.read())
@@ -0,0 +1,64 @@
+import os
+from functools import lru_cache
+from keywords import STOP_WORDS, parse_stop_words, tokenize
+
+# Stop word lists for languages other than English, one <code>.txt file each
+STOP_WORDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stop_words')
+
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'es': 'Spanish',
+    'de': 'German'
+}
+
+# LanguageTool's code for each language; other codes are passed through as given
+LANGUAGETOOL_CODES = {
+    'en': 'en-US',
+    'es': 'es',
+    'de': 'de-DE'
+}
+
+# Frequent function words used to guess a transcript's language
+DETECTION_WORDS = {
+    'en': frozenset('the and is that you of to it in this what was for with have not are but'.split()),
+    'es': frozenset('el la de que y en los las es por una para con no del lo pero se como está'.split()),
+    'de': frozenset('der die das und ist nicht ich du wir es ein eine zu mit auf den dem sie auch aber'.split())
+}
+
+# Characters of text sampled when detecting the language
+DETECTION_SAMPLE_CHARS = 20000
+
+def base_language(code):
+    """Reduce a YouTube or LanguageTool code such as 'es-419' or 'de-DE' to 'es' or 'de'."""
+    return code.replace('_', '-').split('-')[0].lower()
+
+@lru_cache(maxsize=None)
+def language_stop_words(language):
+    """Return the stop words of a language, reading its list the first time it is needed.
+
+    English uses keywords.STOP_WORDS, so English-only runs never touch the
+    lists on disk. Languages without a list get an empty set.
+    """
+    language = base_language(language)
+    if language == 'en':
+        return STOP_WORDS
+
+    path = os.path.join(STOP_WORDS_DIR, f'{language}.txt')
+    if not os.path.exists(path):
+        return frozenset()
+    with open(path, encoding='utf-8') as f:
+        return parse_stop_words(f.read())
+
+def languagetool_code(language):
+    return LANGUAGETOOL_CODES.get(base_language(language), language)
+
+def detect_language(text, default='en'):
+    """Guess the language of the text from how often each language's function words occur."""
+    hits = dict.fromkeys(DETECTION_WORDS, 0)
+    for word in tokenize(text[:DETECTION_SAMPLE_CHARS]):
+        for language, words in DETECTION_WORDS.items():
+            if word in words:
+                hits[language] += 1
+
+    best = max(hits, key=hits.get)
+    return best if hits[best] else default
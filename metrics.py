@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('youtube_transcriber.metrics')
+
+# Per-stage fields summed into run totals, with their Prometheus name and help text
+PROMETHEUS_FIELDS = {
+    'seconds': ('stage_seconds_total', 'Wall time spent in each stage.'),
+    'bytes': ('fetched_bytes_total', 'Bytes downloaded from YouTube.'),
+    'cache_hit': ('cache_hits_total', 'Fetches served from the transcript cache.'),
+    'coalesced': ('coalesced_fetches_total', 'Fetches answered by a concurrent or recent fetch of the same video.'),
+    'characters': ('characters_total', 'Transcript characters processed.'),
+    'words': ('transcript_words_total', 'Transcript words analyzed.'),
+    'terms': ('distinct_terms_total', 'Distinct terms counted per transcript.'),
+    'corrections': ('corrections_total', 'LanguageTool corrections applied.'),
+    'keywords': ('keywords_total', 'Keywords found at or above the minimum number of occurrences.'),
+    'sentences': ('sentences_total', 'Sentences proofread.'),
+    'sentence_hits': ('sentence_cache_hits_total', 'Sentences whose matches came from the proofreading cache.'),
+    'error': ('stage_errors_total', 'Stage calls that raised.')
+}
+
+def prometheus_value(value):
+    """Format a sample value without losing precision: ints exactly, floats by repr."""
+    if isinstance(value, float):
+        return repr(value)
+    return str(int(value))
+
+class Metrics:
+    """Per-video stage timings and counters, with run totals for a Prometheus text file.
+
+    Stages are recorded under the video ID as they run, possibly in different
+    threads, and ``finish`` hands a video's stages over once its result is
+    built. Transcribers without a Metrics object skip all of this, so there is
+    no cost when metrics are off.
+    """
+
+    def __init__(self):
+        self.succeeded = 0
+        self.failed = 0
+        self._videos = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, video_id, name):
+        """Time a stage of a video; the yielded dict takes extra counters such as bytes or corrections."""
+        values = {}
+        start = time.perf_counter()
+        try:
+            yield values
+        except BaseException:
+            values['error'] = True
+            raise
+        finally:
+            values['seconds'] = round(time.perf_counter() - start, 6)
+            self.record(video_id, name, values)
+
+    def record(self, video_id, name, values):
+        with self._lock:
+            # A stage that runs twice for one video, e.g. a repeated metadata lookup, is added up
+            stages = self._videos.setdefault(video_id, {})
+            if name in stages:
+                earlier = stages[name]
+                for key, value in values.items():
+                    if isinstance(value, bool):
+                        earlier[key] = earlier.get(key, False) or value
+                    elif isinstance(value, (int, float)):
+                        earlier[key] = earlier.get(key, 0) + value
+            else:
+                stages[name] = dict(values)
+
+            totals = self._totals.setdefault(name, {'calls': 0, 'max_seconds': 0.0})
+            totals['calls'] += 1
+            totals['max_seconds'] = max(totals['max_seconds'], values.get('seconds', 0.0))
+            for key, value in values.items():
+                if isinstance(value, (bool, int, float)):
+                    totals[key] = totals.get(key, 0) + value
+
+    def finish(self, video_id, success=True):
+        """Return and log a video's recorded stages, counting it as succeeded or failed."""
+        with self._lock:
+            stages = self._videos.pop(video_id, {})
+            if success:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+        video_metrics = {
+            'total_seconds': round(sum(values['seconds'] for values in stages.values()), 6),
+            'stages': stages
+        }
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({'event': 'video', 'video_id': video_id, 'success': success, **video_metrics}))
+        return video_metrics
+
+    def totals(self):
+        with self._lock:
+            return {name: dict(values) for name, values in self._totals.items()}
+
+    def write_prometheus(self, path, extra=None):
+        """Write run totals in the Prometheus text format, e.g. for node_exporter's textfile collector.
+
+        ``extra`` maps a group name to a dict of counters, such as the
+        fetcher or cache stats, exported as youtube_transcriber_<group>_<key>.
+        """
+        totals = self.totals()
+        lines = [
+            '# HELP youtube_transcriber_videos_total Videos processed, by outcome.',
+            '# TYPE youtube_transcriber_videos_total counter',
+            f'youtube_transcriber_videos_total{{outcome="success"}} {self.succeeded}',
+            f'youtube_transcriber_videos_total{{outcome="error"}} {self.failed}',
+            '# HELP youtube_transcriber_stage_calls_total Stage calls.',
+            '# TYPE youtube_transcriber_stage_calls_total counter'
+        ]
+        lines += [f'youtube_transcriber_stage_calls_total{{stage="{name}"}} {values["calls"]}'
+                  for name, values in totals.items()]
+
+        lines += [
+            '# HELP youtube_transcriber_stage_seconds_max Slowest single call of each stage.',
+            '# TYPE youtube_transcriber_stage_seconds_max gauge'
+        ]
+        lines += [f'youtube_transcriber_stage_seconds_max{{stage="{name}"}} {prometheus_value(values["max_seconds"])}'
+                  for name, values in totals.items()]
+
+        for field, (metric, help_text) in PROMETHEUS_FIELDS.items():
+            samples = [(name, values[field]) for name, values in totals.items() if field in values]
+            if not samples:
+                continue
+            lines.append(f'# HELP youtube_transcriber_{metric} {help_text}')
+            lines.append(f'# TYPE youtube_transcriber_{metric} counter')
+            lines += [f'youtube_transcriber_{metric}{{stage="{name}"}} {prometheus_value(value)}' for name, value in samples]
+
+        for group, counters in (extra or {}).items():
+            for key, value in counters.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'# TYPE youtube_transcriber_{group}_{key} gauge')
+                    lines.append(f'youtube_transcriber_{group}_{key} {prometheus_value(value)}')
+
+        # Write to a temporary file and rename, so a collector never reads a partial file
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temporary, path)
@@ -0,0 +1,172 @@
+import threading
+import zlib
+import numpy as np
+from keywords import tokenize
+
+# Permuted hashes are the top 32 bits of a 64-bit multiply-add
+MAX_HASH = (1 << 32) - 1
+
+# Combines the word hashes of a shingle, wrapping around at 64 bits
+SHINGLE_MULTIPLIER = np.uint64(1000003)
+
+# Shingle hashes permuted at a time, bounding the temporary (block x num_perm) array
+HASH_BLOCK = 4096
+
+class MinHasher:
+    """MinHash signatures of transcripts over overlapping word shingles.
+
+    Words come from keywords.tokenize, the tokenizer used for keyword
+    counting, so case, accent encoding and punctuation differences between
+    uploads don't change the signature. Words are hashed with CRC-32, each
+    ``shingle_size``-word shingle's hash is combined from its words' with
+    NumPy, and permuted ``num_perm`` times by multiply-shift hashing; the
+    signature keeps the minimum of each permutation. Two signatures agree in
+    about the same fraction of positions as the Jaccard similarity of the
+    two transcripts' shingle sets.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hashing needs odd multipliers
+        self.a = rng.randint(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.randint(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        return self.signature_of_chunks([text])
+
+    def signature_of_chunks(self, chunks):
+        """Return the signature of text given as pieces, e.g. the lines of a transcript file."""
+        signature = np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        size = self.shingle_size
+        # The last size - 1 words of a piece start shingles that end in the next one
+        carry = []
+        shingled = False
+
+        for chunk in chunks:
+            words = carry + [zlib.crc32(word.encode('utf-8')) for word in tokenize(chunk)]
+            if len(words) >= size:
+                self._update(signature, self._shingles(np.array(words, dtype=np.uint64), size))
+                shingled = True
+            carry = words[len(words) - size + 1:] if size > 1 else []
+
+        # A transcript shorter than one shingle is a single shingle of its words
+        if not shingled and carry:
+            self._update(signature, self._shingles(np.array(carry, dtype=np.uint64), len(carry)))
+        return signature
+
+    def _shingles(self, word_hashes, size):
+        count = len(word_hashes) - size + 1
+        shingles = word_hashes[:count].copy()
+        for offset in range(1, size):
+            shingles = shingles * SHINGLE_MULTIPLIER ^ word_hashes[offset:offset + count]
+        return shingles
+
+    def _update(self, signature, shingles):
+        for start in range(0, len(shingles), HASH_BLOCK):
+            block = shingles[start:start + HASH_BLOCK, np.newaxis]
+            permuted = (block * self.a + self.b) >> np.uint64(32)
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the transcripts behind two signatures."""
+    return float(np.mean(signature == other))
+
+def choose_bands(threshold, num_perm):
+    """Pick the LSH (bands, rows) split whose candidate threshold is highest without exceeding threshold.
+
+    A pair with similarity s shares a bucket with probability
+    1 - (1 - s**rows)**bands, which rises steeply around (1/bands)**(1/rows).
+    Keeping that point at or below the threshold favours recall; candidates
+    are then checked against the threshold with their full signatures.
+    """
+    best = (num_perm, 1)
+    best_point = 0.0
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        point = (1 / bands) ** (1 / rows)
+        if best_point < point <= threshold:
+            best, best_point = (bands, rows), point
+    return best
+
+class LSHIndex:
+    """Banded locality-sensitive hashing index over MinHash signatures.
+
+    Each signature is cut into bands and stored in one bucket per band, so
+    finding near-duplicates of a transcript only compares it with the
+    transcripts sharing a bucket, not with every transcript indexed.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128):
+        self.threshold = threshold
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = {}
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key, signature):
+        self.signatures[key] = signature
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, []).append(key)
+
+    def query(self, signature):
+        """Return (key, similarity) of indexed signatures at or above the threshold, most similar first."""
+        candidates = set()
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            score = similarity(signature, self.signatures[key])
+            if score >= self.threshold:
+                matches.append((key, score))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def __len__(self):
+        return len(self.signatures)
+
+class NearDuplicateFilter:
+    """Thread-safe first-seen-wins near-duplicate detection for a stream of transcripts.
+
+    Each key is only checked once; asking about it again returns the first
+    answer without hashing the text again.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=3):
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.index = LSHIndex(threshold, num_perm)
+        self.checked = {}
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def check(self, key, text):
+        """Return (original key, similarity) if text nearly duplicates an earlier transcript.
+
+        Otherwise the transcript is indexed under key and None is returned.
+        """
+        with self._lock:
+            if key in self.checked:
+                return self.checked[key]
+        return self.check_signature(key, self.hasher.signature(text))
+
+    def check_signature(self, key, signature):
+        with self._lock:
+            if key in self.checked:
+                return self.checked[key]
+
+            matches = self.index.query(signature)
+            if matches:
+                self.duplicates += 1
+                duplicate = matches[0]
+            else:
+                self.index.add(key, signature)
+                duplicate = None
+            self.checked[key] = duplicate
+            return duplicate
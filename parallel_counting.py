@@ -0,0 +1,177 @@
+import os
+import re
+from array import array
+from collections import Counter
+from keywords import MIN_WORD_LENGTH, PHRASE_PATTERN, count_terms, estimate_memory, fold, normalize
+from languages import detect_language, language_stop_words
+
+# Below this many characters in total (or bytes of transcript files), text is
+# counted in-process: starting workers and shipping the text to them would
+# take longer than the counting itself
+PARALLEL_MIN_CHARS = 1 << 21
+
+# Exact counts of a longer script are split into pieces of about this size,
+# so a single long script still keeps every worker busy
+PIECE_CHARS = 1 << 20
+
+# Whitespace-separated tokens, for finding where a script can be cut
+TOKEN_RUN = re.compile(r'\S+')
+
+def pack_counts(counts):
+    """Flatten term counts into a newline-joined string of terms and an array of counts.
+
+    Two flat objects pickle faster than a dict of many short strings and
+    ints, so workers hand their counts back this way. Terms never contain
+    newlines.
+    """
+    return '\n'.join(counts), array('I', counts.values())
+
+def unpack_counts(terms, counts):
+    """Rebuild the Counter flattened by pack_counts, in the same order."""
+    if not terms:
+        return Counter()
+    return Counter(dict(zip(terms.split('\n'), counts)))
+
+def add_packed_counts(counter, terms, counts):
+    """Add counts flattened by pack_counts to a Counter, keeping first-seen order for new terms."""
+    if not terms:
+        return
+    if not counter:
+        counter.update(dict(zip(terms.split('\n'), counts)))
+        return
+    get = counter.get
+    for term, count in zip(terms.split('\n'), counts):
+        counter[term] = get(term, 0) + count
+
+def run_bounded(func, tasks, max_workers=None, on_done=None):
+    """Apply func to every tuple of arguments in tasks across a process pool, in input order.
+
+    At most twice as many tasks as there are workers are in flight, so the
+    tasks are consumed lazily. on_done(done) is called after each task.
+    """
+    # Imported here because multiprocessing is slow to import and small inputs never need it
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    max_workers = max_workers or os.cpu_count() or 1
+    results = {}
+    pending = {}
+    tasks = iter(tasks)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        index = 0
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_workers * 2:
+                try:
+                    args = next(tasks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(func, *args)] = index
+                index += 1
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+                if on_done:
+                    on_done(len(results))
+
+    return [results[i] for i in range(len(results))]
+
+def split_script(text, stop_words, min_length=MIN_WORD_LENGTH, piece_chars=PIECE_CHARS):
+    """Yield pieces of about piece_chars that together make up the text.
+
+    Each cut follows a token ending in punctuation, a stop word or a short
+    word, which ends any phrase, so counting the pieces separately and
+    adding up the counts gives exactly the counts of the whole text.
+    """
+    start = 0
+    while len(text) - start > piece_chars:
+        cut = None
+        position = start + piece_chars
+        # Skip the rest of a token the target position falls inside
+        if not text[position - 1].isspace():
+            rest = TOKEN_RUN.match(text, position)
+            if rest:
+                position = rest.end()
+
+        for match in TOKEN_RUN.finditer(text, position):
+            marks = PHRASE_PATTERN.findall(fold(match.group()))
+            if marks:
+                last = normalize(marks[-1])
+                if len(last) < min_length or last in stop_words:
+                    cut = match.end()
+                    break
+            if match.end() - position > piece_chars:
+                break
+
+        if cut is None:
+            break
+        yield text[start:cut]
+        start = cut
+
+    yield text[start:]
+
+def _count_piece(text, stop_words, max_n, max_terms):
+    stats = {}
+    counts = count_terms(text, stop_words, MIN_WORD_LENGTH, max_n, max_terms, stats)
+    return pack_counts(counts), len(text.split()), stats
+
+def count_script(text, extra_stop_words=frozenset(), max_n=1, max_terms=None, language='en'):
+    """Count one script in-process, with language's stop words plus extra_stop_words.
+
+    Returns the term counts, the number of words and the counting stats of
+    keywords.count_terms, including the language, detected when 'auto'.
+    """
+    if language == 'auto':
+        language = detect_language(text)
+    stats = {'language': language}
+    counts = count_terms(text, language_stop_words(language) | extra_stop_words, MIN_WORD_LENGTH, max_n, max_terms, stats)
+    return counts, len(text.split()), stats
+
+def count_scripts(scripts, extra_stop_words=frozenset(), max_n=1, max_terms=None, language='en', max_workers=None):
+    """Count many scripts like count_script, across a process pool when there is enough text.
+
+    Scripts are tokenized and counted in worker processes, which return
+    their counts packed by pack_counts, and long scripts are split into
+    pieces whose counts are merged back in order. The results, in input
+    order, are identical to counting each script in-process, which is what
+    happens when the scripts add up to less than PARALLEL_MIN_CHARS.
+    """
+    if sum(len(script) for script in scripts) < PARALLEL_MIN_CHARS:
+        return [count_script(script, extra_stop_words, max_n, max_terms, language) for script in scripts]
+
+    languages = [detect_language(script) if language == 'auto' else language for script in scripts]
+    owners = []
+
+    def tasks():
+        # Top-k counts of pieces can't be added up exactly, so those scripts stay whole
+        for number, (script, script_language) in enumerate(zip(scripts, languages)):
+            stop_words = language_stop_words(script_language) | extra_stop_words
+            for piece in ([script] if max_terms else split_script(script, stop_words)):
+                owners.append(number)
+                yield piece, stop_words, max_n, max_terms
+
+    piece_results = run_bounded(_count_piece, tasks(), max_workers)
+
+    # Merge each script's pieces in order, so equal counts keep the order of a whole-script count
+    script_counts = [Counter() for _ in scripts]
+    word_counts = [0] * len(scripts)
+    piece_stats = [[] for _ in scripts]
+    for number, ((terms, counts), word_count, stats) in zip(owners, piece_results):
+        add_packed_counts(script_counts[number], terms, counts)
+        word_counts[number] += word_count
+        piece_stats[number].append(stats)
+
+    results = []
+    for counts, word_count, stats_list, script_language in zip(script_counts, word_counts, piece_stats, languages):
+        if len(stats_list) == 1:
+            stats = stats_list[0]
+        else:
+            stats = {'mode': 'exact', 'memory_bytes': estimate_memory(counts), 'error_bound': 0}
+        stats['language'] = script_language
+        results.append((counts, word_count, stats))
+    return results
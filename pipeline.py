@@ -0,0 +1,152 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Marks the end of the stream on a stage's input queue
+_DONE = object()
+
+class VideoPipeline:
+    """Asynchronous fetch -> proofread -> analyze pipeline over a YouTubeTranscriber.
+
+    Each stage runs its own number of workers and hands work to the next
+    stage through a bounded queue. When a downstream stage falls behind its
+    queue fills up and upstream workers wait, so no more than a few items
+    per stage are in memory at once. The blocking transcriber calls run in
+    threads, so network waits, proofreading and keyword counting for
+    different videos overlap. A large batch then takes about as long as its
+    slowest stage rather than the sum of all stages. Each run has its own
+    thread pool with one thread per worker of every stage, so no stage's
+    limit is capped by, or takes threads from, another.
+    """
+
+    def __init__(self, transcriber, min_occurrences=3, output_format='text',
+                 fetch_concurrency=8, proofread_concurrency=1, analyze_concurrency=1, queue_size=16):
+        self.transcriber = transcriber
+        self.min_occurrences = min_occurrences
+        self.output_format = output_format
+        self.fetch_concurrency = fetch_concurrency
+        self.proofread_concurrency = proofread_concurrency
+        self.analyze_concurrency = analyze_concurrency
+        self.queue_size = queue_size
+        self._executor = None
+
+    def _in_thread(self, func, *args):
+        """Run a blocking call in the run's thread pool."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args))
+
+    async def _fetch(self, youtube_url):
+        video_id, video_title, segments = await self._in_thread(self.transcriber.fetch_video, youtube_url)
+        return {'url': youtube_url, 'video_id': video_id, 'title': video_title, 'segments': segments}
+
+    async def _proofread(self, item):
+        text = item['segments'].text
+        # Near-duplicates are found before proofreading, so skipped ones are never proofread
+        duplicate = await self._in_thread(self.transcriber.find_duplicate, item['video_id'], text)
+        if duplicate is not None and self.transcriber.skip_duplicates:
+            return item
+
+        if self.transcriber.language_tool is not None:
+            language = self.transcriber.transcript_language(text, item['segments'])
+            item['proofread'] = await self._in_thread(self.transcriber.proofread_text, text, True, item['video_id'], language)
+        return item
+
+    async def _analyze(self, item):
+        return await self._in_thread(
+            self.transcriber.build_result,
+            item['url'], item['title'], item['segments'],
+            self.min_occurrences, self.output_format, item.get('proofread')
+        )
+
+    async def _worker(self, step, inbox, outbox):
+        """Apply step to items from inbox until it is closed, turning failures into error records."""
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+
+            # Error records pass straight through to the output
+            if not isinstance(item, _Failed):
+                try:
+                    item = await step(item)
+                except Exception as e:
+                    item = _Failed(self.transcriber.build_error(_url_of(item), e, self.output_format))
+
+            await outbox.put(item)
+
+    async def _stage(self, step, concurrency, inbox, outbox):
+        """Run a stage's workers and close the next queue once they have all finished."""
+        workers = [asyncio.create_task(self._worker(step, inbox, outbox)) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        await outbox.put(_DONE)
+
+    async def _feed(self, youtube_urls, inbox, concurrency):
+        for youtube_url in youtube_urls:
+            await inbox.put(youtube_url)
+        for _ in range(concurrency):
+            await inbox.put(_DONE)
+
+    async def run(self, youtube_urls):
+        """Yield a result for every URL in completion order.
+
+        Closing the generator early, or cancelling the task consuming it,
+        cancels every stage; calls already running in threads finish in the
+        background and their results are dropped.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.fetch_concurrency + self.proofread_concurrency + self.analyze_concurrency
+        )
+        urls = asyncio.Queue(self.queue_size)
+        fetched = asyncio.Queue(self.queue_size)
+        proofread = asyncio.Queue(self.queue_size)
+        results = asyncio.Queue(self.queue_size)
+
+        # Each stage's worker count decides how many end markers it needs upstream
+        tasks = [
+            asyncio.create_task(self._feed(youtube_urls, urls, self.fetch_concurrency)),
+            asyncio.create_task(self._stage(self._fetch, self.fetch_concurrency, urls, _Fanout(fetched, self.proofread_concurrency))),
+            asyncio.create_task(self._stage(self._proofread, self.proofread_concurrency, fetched, _Fanout(proofread, self.analyze_concurrency))),
+            asyncio.create_task(self._stage(self._analyze, self.analyze_concurrency, proofread, results)),
+        ]
+
+        try:
+            while True:
+                item = await results.get()
+                if item is _DONE:
+                    break
+                yield item.record if isinstance(item, _Failed) else item
+
+            # Surface any unexpected error from the stages themselves
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Calls still running finish in the background; queued ones are dropped
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+class _Failed:
+    """Error record travelling through the remaining stages untouched."""
+
+    def __init__(self, record):
+        self.record = record
+
+class _Fanout:
+    """Queue wrapper that turns one end marker into one per downstream worker."""
+
+    def __init__(self, queue, consumers):
+        self.queue = queue
+        self.consumers = consumers
+
+    async def put(self, item):
+        if item is _DONE:
+            for _ in range(self.consumers):
+                await self.queue.put(_DONE)
+        else:
+            await self.queue.put(item)
+
+def _url_of(item):
+    return item['url'] if isinstance(item, dict) else item
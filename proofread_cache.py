@@ -0,0 +1,122 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from transcript_cache import DEFAULT_CACHE_PATH
+
+DEFAULT_MAX_SENTENCES = 500000
+
+# Keys looked up per query, well under SQLite's limit on statement parameters
+LOOKUP_BATCH = 500
+
+# Access times are only refreshed once they are this old, so repeated runs
+# don't rewrite the access index for every sentence they reuse
+ACCESS_RESOLUTION = 60 * 60
+
+def proofread_cache_path(cache_path):
+    """Path of the proofreading cache kept next to the transcript cache at cache_path."""
+    return os.path.join(os.path.dirname(os.path.abspath(cache_path)), 'proofread.sqlite3')
+
+DEFAULT_PROOFREAD_CACHE_PATH = proofread_cache_path(DEFAULT_CACHE_PATH)
+
+class ProofreadCache:
+    """Persistent LRU cache of LanguageTool matches per sentence.
+
+    Sentences are stored under proofreading.sentence_key, a SHA-1 of their
+    language and text, with only what proofreading needs from each match:
+    its offset within the sentence, its length and the first suggested
+    replacement (or None). Once more than ``max_entries`` sentences are
+    stored, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_PROOFREAD_CACHE_PATH, max_entries=DEFAULT_MAX_SENTENCES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentences (
+                key BLOB PRIMARY KEY,
+                matches TEXT NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sentences_accessed ON sentences (accessed)")
+        self._conn.commit()
+        # Counted once here and then kept up to date, so eviction needs no COUNT(*) per write
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM sentences").fetchone()[0]
+
+    def get_many(self, keys):
+        """Return a dict of key -> matches for the cached keys, marking them as recently used."""
+        keys = list(keys)
+        found = {}
+        stale = []
+        now = time.time()
+
+        with self._lock:
+            for i in range(0, len(keys), LOOKUP_BATCH):
+                batch = keys[i:i + LOOKUP_BATCH]
+                placeholders = ', '.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, matches, accessed FROM sentences WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                if not rows:
+                    continue
+
+                # Decode the whole batch as one JSON array instead of one document per sentence
+                values = json.loads('[' + ','.join(row[1] for row in rows) + ']')
+                found.update(zip((row[0] for row in rows), values))
+                stale.extend(row[0] for row in rows if now - row[2] > ACCESS_RESOLUTION)
+
+            if stale:
+                self._conn.executemany("UPDATE sentences SET accessed = ? WHERE key = ?", ((now, key) for key in stale))
+                self._conn.commit()
+
+        return found
+
+    def put_many(self, entries):
+        """Store key -> matches entries and evict the least recently used sentences beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sentences (key, matches, accessed) VALUES (?, ?, ?)",
+                ((key, json.dumps(matches, ensure_ascii=False), now) for key, matches in entries.items())
+            )
+            self._entries += self._conn.total_changes - before
+
+            if self.max_entries is not None and self._entries > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM sentences WHERE key IN (SELECT key FROM sentences ORDER BY accessed LIMIT ?)",
+                    (self._entries - self.max_entries,)
+                )
+                self._entries = self.max_entries
+            self._conn.commit()
+
+    def record(self, hits, misses):
+        """Count sentences answered from the cache and sentences sent to the checker."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self):
+        """Return hit/miss counters and the number of stored sentences."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': self._entries
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,291 @@
+import re
+import hashlib
+import queue
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+
+# Whitespace following the end of a sentence; chunks are cut right after it
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# A sentence without its surrounding whitespace: up to the first end mark followed by whitespace, or the rest of the text
+SENTENCE = re.compile(r'\S(?:.*?[.!?](?=\s)|.*\S)?', re.S)
+
+# The parts of a LanguageTool match that proofreading uses, rebuilt from the sentence cache
+CachedMatch = namedtuple('CachedMatch', 'offset errorLength replacements')
+
+# Keep each LanguageTool request well under its default text size limits
+DEFAULT_CHUNK_CHARS = 20000
+
+def apply_corrections(text, matches, applied=None, base=0):
+    """Apply the first suggested replacement of each match to the text in a single pass.
+
+    Matches are applied in offset order and the output is assembled from a
+    list of spans joined once at the end, instead of re-slicing the whole
+    text for every correction. Matches that overlap an already applied
+    correction are skipped. If an applied list is given, an
+    (offset + base, length, replacement) tuple is appended to it for every
+    correction made.
+    """
+    parts = []
+    position = 0
+
+    for match in sorted(matches, key=lambda m: m.offset):
+        if not match.replacements or match.offset < position:
+            continue
+
+        parts.append(text[position:match.offset])
+        parts.append(match.replacements[0])
+        position = match.offset + match.errorLength
+
+        if applied is not None:
+            applied.append((match.offset + base, match.errorLength, match.replacements[0]))
+
+    if not parts:
+        return text
+
+    parts.append(text[position:])
+    return ''.join(parts)
+
+def split_into_chunks(text, max_chars=DEFAULT_CHUNK_CHARS):
+    """Yield consecutive chunks of at most max_chars characters that join back to the text.
+
+    Chunks end on a sentence boundary where possible, then on whitespace,
+    and only split a word when a single word is longer than max_chars.
+    """
+    start = 0
+    length = len(text)
+
+    while length - start > max_chars:
+        limit = start + max_chars
+
+        # Prefer the last sentence boundary inside the window
+        end = None
+        for match in SENTENCE_END.finditer(text, start, limit):
+            end = match.end()
+
+        # Auto-generated captions rarely have punctuation, so fall back to whitespace
+        if end is None or end <= start:
+            end = text.rfind(' ', start, limit) + 1
+        if end <= start:
+            end = limit
+
+        yield text[start:end]
+        start = end
+
+    if start < length or not length:
+        yield text[start:]
+
+def split_sentences(text, max_chars=DEFAULT_CHUNK_CHARS):
+    """Return the (start, end) span of every sentence in the text, without surrounding whitespace.
+
+    Sentences longer than max_chars are cut like split_into_chunks.
+    """
+    spans = []
+    for match in SENTENCE.finditer(text):
+        start, end = match.span()
+        if end - start <= max_chars:
+            spans.append((start, end))
+            continue
+        for piece in split_into_chunks(match.group(), max_chars):
+            spans.append((start, start + len(piece)))
+            start += len(piece)
+    return spans
+
+def proofread(checker, text, max_chars=DEFAULT_CHUNK_CHARS, max_workers=1, corrections=None, cache=None,
+              language='', cache_stats=None):
+    """Check the text chunk by chunk and return the corrected text and number of matches.
+
+    ``checker`` is anything with a LanguageTool-style ``check(text)`` method.
+    With max_workers above 1 the chunks are checked concurrently, which only
+    helps when the checker is a CheckerPool with several instances. If a
+    corrections list is given, the applied corrections are appended to it
+    with offsets into the original text.
+
+    With a ProofreadCache the text is checked sentence by sentence instead:
+    sentences seen before, earlier in the text or in an earlier text checked
+    in the same language, reuse their stored matches, and only novel
+    sentences are sent to the checker. A cache_stats dict is then filled
+    with the number of sentences and cache hits.
+    """
+    if cache is not None:
+        return _proofread_sentences(checker, text, max_chars, max_workers, corrections, cache, language, cache_stats)
+
+    chunks = split_into_chunks(text, max_chars)
+    corrected_parts = []
+    match_count = 0
+    base = 0
+
+    if max_workers > 1:
+        chunks = list(chunks)
+        # Imported here so single-checker runs and CLI startup never load it
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_matches = executor.map(checker.check, chunks)
+            for chunk, matches in zip(chunks, all_matches):
+                match_count += len(matches)
+                corrected_parts.append(apply_corrections(chunk, matches, corrections, base))
+                base += len(chunk)
+    else:
+        for chunk in chunks:
+            matches = checker.check(chunk)
+            match_count += len(matches)
+            corrected_parts.append(apply_corrections(chunk, matches, corrections, base))
+            base += len(chunk)
+
+    return ''.join(corrected_parts), match_count
+
+def sentence_key(language, sentence):
+    """Hash a sentence together with the language it is checked in, for the sentence cache."""
+    return hashlib.sha1(f'{language}\0{sentence}'.encode('utf-8')).digest()
+
+def _proofread_sentences(checker, text, max_chars, max_workers, corrections, cache, language, cache_stats):
+    spans = split_sentences(text, max_chars)
+    keys = [sentence_key(language, text[start:end]) for start, end in spans]
+    known = cache.get_many(set(keys))
+
+    # A sentence repeated within the text is only checked once
+    novel = {}
+    for key, (start, end) in zip(keys, spans):
+        if key not in known and key not in novel:
+            novel[key] = text[start:end]
+
+    if novel:
+        checked = _check_sentences(checker, novel, max_chars, max_workers)
+        cache.put_many(checked)
+        known.update(checked)
+
+    hits = len(spans) - len(novel)
+    cache.record(hits, len(novel))
+    if cache_stats is not None:
+        cache_stats.update(sentences=len(spans), hits=hits)
+
+    matches = [
+        CachedMatch(start + offset, length, [replacement] if replacement is not None else [])
+        for key, (start, _) in zip(keys, spans)
+        for offset, length, replacement in known[key]
+    ]
+    return apply_corrections(text, matches, corrections), len(matches)
+
+def _check_sentences(checker, sentences, max_chars, max_workers):
+    """Check key -> sentence pairs joined into chunks and return key -> [offset, length, replacement] lists.
+
+    Offsets are relative to each sentence; matches that run across the
+    space between two joined sentences belong to neither and are dropped.
+    """
+    chunks = []
+    parts, starts, keys, size = [], [], [], 0
+    for key, sentence in sentences.items():
+        if parts and size + 1 + len(sentence) > max_chars:
+            chunks.append((' '.join(parts), starts, keys, parts))
+            parts, starts, keys, size = [], [], [], 0
+        start = size + 1 if parts else 0
+        parts.append(sentence)
+        starts.append(start)
+        keys.append(key)
+        size = start + len(sentence)
+    if parts:
+        chunks.append((' '.join(parts), starts, keys, parts))
+
+    texts = [chunk[0] for chunk in chunks]
+    if max_workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_matches = list(executor.map(checker.check, texts))
+    else:
+        all_matches = [checker.check(chunk_text) for chunk_text in texts]
+
+    checked = {key: [] for key in sentences}
+    for (_, starts, keys, parts), matches in zip(chunks, all_matches):
+        for match in matches:
+            i = bisect_right(starts, match.offset) - 1
+            if i < 0 or match.offset - starts[i] + match.errorLength > len(parts[i]):
+                continue
+            offset = match.offset - starts[i]
+            replacement = match.replacements[0] if match.replacements else None
+            checked[keys[i]].append([offset, match.errorLength, replacement])
+    return checked
+
+class CheckerPool:
+    """A pool of LanguageTool checkers that are only started when first needed.
+
+    Each checker either launches its own local LanguageTool server (a JVM) or,
+    when ``remote_server`` is given, talks to an already running LanguageTool
+    HTTP server such as ``http://localhost:8081``. Up to ``size`` checkers are
+    created on demand, so chunks can be checked in parallel.
+    """
+
+    def __init__(self, language='en-US', size=1, remote_server=None):
+        self.language = language
+        self.size = size
+        self.remote_server = remote_server
+        self._idle = queue.Queue()
+        self._created = []
+        self._lock = threading.Lock()
+
+    def _create(self):
+        # Imported here so runs that never proofread don't pay for it
+        import language_tool_python
+
+        if self.remote_server:
+            return language_tool_python.LanguageTool(self.language, remote_server=self.remote_server)
+        return language_tool_python.LanguageTool(self.language)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._created) < self.size:
+                checker = self._create()
+                self._created.append(checker)
+                return checker
+
+        # Every checker is busy, wait for one to be released
+        return self._idle.get()
+
+    def check(self, text):
+        """Check the text with the next free checker."""
+        checker = self._acquire()
+        try:
+            return checker.check(text)
+        finally:
+            self._idle.put(checker)
+
+    @property
+    def started(self):
+        return bool(self._created)
+
+    def close(self):
+        """Shut down every checker that was started."""
+        with self._lock:
+            for checker in self._created:
+                checker.close()
+            self._created = []
+            self._idle = queue.Queue()
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+def shared_pool(language='en-US', size=1, remote_server=None):
+    """Return the process-wide CheckerPool for a language and server, creating it if needed."""
+    key = (language, remote_server)
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = CheckerPool(language, size, remote_server)
+        else:
+            pool.size = max(pool.size, size)
+        return pool
+
+def close_shared_pools():
+    """Shut down the checkers of every shared pool, e.g. when a long-running service stops."""
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,175 @@
+import random
+import socket
+import threading
+import time
+import urllib.error
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# HTTP statuses worth retrying; 429 also counts as being throttled
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Exception class names from youtube_transcript_api and pytube that signal
+# temporary trouble, matched by name so those packages need not be imported
+RETRYABLE_ERRORS = {'TooManyRequests', 'YouTubeRequestFailed', 'RequestBlocked', 'IpBlocked'}
+THROTTLE_ERRORS = {'TooManyRequests', 'RequestBlocked', 'IpBlocked'}
+
+def http_status(error):
+    """Return the HTTP status carried by an exception, if any."""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+def is_throttled(error):
+    return http_status(error) == 429 or type(error).__name__ in THROTTLE_ERRORS
+
+def is_retryable(error):
+    """Decide whether a failed fetch is worth trying again."""
+    status = http_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    if type(error).__name__ in RETRYABLE_ERRORS:
+        return True
+    # urllib wraps network failures, so judge the underlying error
+    if isinstance(error, urllib.error.URLError) and isinstance(error.reason, BaseException):
+        error = error.reason
+    # Connection resets and refusals, timeouts and DNS failures, but not other OSErrors such as missing files
+    return isinstance(error, (ConnectionError, TimeoutError, socket.gaierror))
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second with bursts of ``burst``.
+
+    Callers that find the bucket empty reserve a future token and sleep until
+    it is due, so waiting callers are served in order.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping if necessary. Returns the time spent waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+class Fetcher:
+    """Shared rate limiting, retries and request coalescing for YouTube fetches.
+
+    ``call`` waits for the token bucket and retries retryable errors with
+    jittered exponential backoff. ``coalesce`` makes concurrent requests for
+    the same key share one fetch, and remembers the last ``remember``
+    results so a video listed twice in a batch is only fetched once.
+    """
+
+    def __init__(self, rate=5.0, burst=5, retries=3, base_delay=1.0, max_delay=30.0, remember=128):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.remember = remember
+        self.requests = 0
+        self.retried = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def call(self, func):
+        """Call func under the rate limit, retrying retryable errors."""
+        attempt = 0
+        while True:
+            if self.bucket is not None and self.bucket.acquire():
+                with self._lock:
+                    self.rate_limited += 1
+
+            with self._lock:
+                self.requests += 1
+
+            try:
+                return func()
+            except Exception as e:
+                throttled = is_throttled(e)
+                if throttled:
+                    with self._lock:
+                        self.throttled += 1
+
+                if attempt >= self.retries or not is_retryable(e):
+                    raise
+
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.backoff(attempt, e))
+                attempt += 1
+
+    def backoff(self, attempt, error=None):
+        """Return the delay before the next attempt: full jitter over an exponential ceiling.
+
+        A Retry-After header on the error is honoured as a lower bound.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+        headers = getattr(error, 'headers', None) or getattr(getattr(error, 'response', None), 'headers', None)
+        retry_after = headers.get('Retry-After') if headers else None
+        if retry_after and str(retry_after).isdigit():
+            delay = max(delay, min(float(retry_after), self.max_delay))
+
+        return delay
+
+    def coalesce(self, key, func):
+        """Return func()'s result, sharing it with concurrent and recent calls for the same key."""
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                self.coalesced += 1
+                return self._recent[key]
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            with self._lock:
+                if self.remember:
+                    self._recent[key] = value
+                    while len(self._recent) > self.remember:
+                        self._recent.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retried,
+                'throttled': self.throttled,
+                'rate_limited': self.rate_limited,
+                'coalesced': self.coalesced
+            }
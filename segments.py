@@ -0,0 +1,144 @@
+import unicodedata
+from array import array
+from bisect import bisect_right
+from collections import deque
+from keywords import MIN_WORD_LENGTH, PHRASE_PATTERN, STOP_WORDS, fold, normalize
+
+class TranscriptSegments:
+    """Timed transcript segments stored as parallel arrays over one text buffer.
+
+    ``text`` is every segment's text joined with single spaces, and segment
+    ``i`` starts at character ``offsets[i]``, is spoken at ``starts[i]``
+    seconds and lasts ``durations[i]`` seconds. Three flat arrays take a
+    fraction of the memory of the list of dicts returned by
+    YouTubeTranscriptApi, while keeping every position in the text mappable
+    back to a time.
+    """
+
+    def __init__(self, text='', offsets=None, starts=None, durations=None, language=None):
+        self.text = text
+        self.language = language
+        self.offsets = array('q', offsets or ())
+        self.starts = array('d', starts or ())
+        self.durations = array('d', durations or ())
+
+    @classmethod
+    def from_transcript_list(cls, transcript_list, language=None):
+        """Build segments from YouTubeTranscriptApi's list of {'text', 'start', 'duration'} dicts.
+
+        Text is NFC-normalized, so accented words tokenize as one word and
+        offsets stay valid for the stored text.
+        """
+        segments = cls(language=language)
+        parts = []
+        position = 0
+
+        for item in transcript_list:
+            text = item['text']
+            if not text.isascii():
+                text = unicodedata.normalize('NFC', text)
+            if parts:
+                position += 1
+            segments.offsets.append(position)
+            segments.starts.append(item.get('start', 0.0))
+            segments.durations.append(item.get('duration', 0.0))
+            parts.append(text)
+            position += len(text)
+
+        segments.text = ' '.join(parts)
+        return segments
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['text'], data['offsets'], data['starts'], data['durations'], data.get('language'))
+
+    def to_dict(self):
+        """Return a JSON-serializable form, as stored in the transcript cache."""
+        data = {
+            'text': self.text,
+            'offsets': self.offsets.tolist(),
+            'starts': self.starts.tolist(),
+            'durations': self.durations.tolist()
+        }
+        if self.language:
+            data['language'] = self.language
+        return data
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def duration(self):
+        """Seconds from the start of the video to the end of the last segment."""
+        if not self.offsets:
+            return 0.0
+        return self.starts[-1] + self.durations[-1]
+
+    def segment_at(self, offset):
+        """Return the index of the segment containing a character offset of the text."""
+        return max(bisect_right(self.offsets, offset) - 1, 0)
+
+    def time_at(self, offset):
+        """Return the start time, in seconds, of the segment containing a character offset."""
+        if not self.offsets:
+            return 0.0
+        return self.starts[self.segment_at(offset)]
+
+    def iter_term_offsets(self, stop_words=STOP_WORDS, min_length=MIN_WORD_LENGTH, max_n=1):
+        """Yield (term, offset) for every term keywords.iter_terms would yield, with its start offset."""
+        window = deque(maxlen=max_n)
+        for match in PHRASE_PATTERN.finditer(self.text):
+            word = normalize(fold(match.group()))
+            if len(word) < min_length or word in stop_words:
+                window.clear()
+                continue
+
+            window.append((word, match.start()))
+            yield word, match.start()
+            for n in range(2, len(window) + 1):
+                phrase = list(window)[-n:]
+                yield ' '.join(w for w, _ in phrase), phrase[0][1]
+
+    def keyword_timings(self, keywords, stop_words=STOP_WORDS, max_n=1):
+        """Return when each keyword is spoken: first and last time and occurrences per minute."""
+        first = {}
+        last = {}
+        counts = {}
+        for term, offset in self.iter_term_offsets(stop_words, MIN_WORD_LENGTH, max_n):
+            if term not in keywords:
+                continue
+            time = self.time_at(offset)
+            first.setdefault(term, time)
+            last[term] = time
+            counts[term] = counts.get(term, 0) + 1
+
+        minutes = self.duration / 60
+        return {
+            term: {
+                'first': first[term],
+                'last': last[term],
+                'per_minute': round(counts[term] / minutes, 3) if minutes else None
+            }
+            for term in keywords if term in first
+        }
+
+    def map_corrections(self, corrections):
+        """Attach the segment and time to each (offset, length, replacement) correction."""
+        return [
+            {
+                'segment': self.segment_at(offset),
+                'time': self.time_at(offset),
+                'original': self.text[offset:offset + length],
+                'replacement': replacement
+            }
+            for offset, length, replacement in corrections
+        ]
+
+def format_time(seconds):
+    """Format seconds as m:ss or h:mm:ss, like YouTube does."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
@@ -0,0 +1,16 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope='session')
+def cli():
+    """The youtube-transcriber.py module, whose file name can't be imported directly."""
+    spec = importlib.util.spec_from_file_location('youtube_transcriber', os.path.join(ROOT, 'youtube-transcriber.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import Counter, namedtuple
+
+DEFAULT_TRANSCRIPT = 'machine learning is teh future\nmachine learning models\nlearning machine'
+
+Match = namedtuple('Match', 'offset errorLength replacements')
+
+class FakeBackend:
+    """Stands in for YouTubeBackend with canned transcripts and injected failures.
+
+    ``transcripts`` maps a video ID to its text, one segment per line, or
+    to None for a video without a transcript; other videos get
+    DEFAULT_TRANSCRIPT. ``failures`` maps (kind, video ID), kind being
+    'transcript' or 'metadata', to exceptions raised by successive calls
+    before they succeed. ``gate``, if given, is an Event every fetch waits
+    for.
+    """
+
+    def __init__(self, transcripts=None, failures=None, delay=0.0, gate=None):
+        self.transcripts = transcripts or {}
+        self.failures = {key: list(errors) for key, errors in (failures or {}).items()}
+        self.delay = delay
+        self.gate = gate
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _call(self, kind, video_id):
+        with self._lock:
+            self.calls[kind, video_id] += 1
+            errors = self.failures.get((kind, video_id))
+            error = errors.pop(0) if errors else None
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.delay:
+            time.sleep(self.delay)
+        if error is not None:
+            raise error
+
+    def fetch_transcript(self, video_id, language='en'):
+        self._call('transcript', video_id)
+        text = self.transcripts.get(video_id, DEFAULT_TRANSCRIPT)
+        if text is None:
+            raise ValueError('No transcript available')
+        lines = text.split('\n')
+        return [{'text': line, 'start': i * 2.0, 'duration': 2.0} for i, line in enumerate(lines)], None
+
+    def fetch_metadata(self, video_id):
+        self._call('metadata', video_id)
+        return {'title': f'Title {video_id}', 'channel': 'Channel', 'published': '2024-01-01'}
+
+class FakeChecker:
+    """Stands in for a LanguageTool pool, flagging every 'teh'."""
+
+    started = True
+
+    def __init__(self):
+        self.checked = []
+
+    def check(self, text):
+        self.checked.append(text)
+        matches = []
+        start = text.find('teh')
+        while start != -1:
+            matches.append(Match(start, 3, ['the']))
+            start = text.find('teh', start + 1)
+        return matches
+
+    def close(self):
+        pass
+
+def make_transcriber(cli, backend, proofread=True, **kwargs):
+    """A YouTubeTranscriber over a fake backend, proofreading with FakeChecker unless proofread is False."""
+    transcriber = cli.YouTubeTranscriber(backend=backend, proofread=False, **kwargs)
+    if proofread:
+        transcriber.language_tool = FakeChecker()
+    return transcriber
+
+def urls(*video_ids):
+    return [f'https://youtu.be/{video_id}' for video_id in video_ids]
@@ -0,0 +1,34 @@
+import json
+
+def run_analyze(cli, capsys, *argv):
+    cli.analyze_main([*map(str, argv), '-o', 'jsonl'])
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+def test_bad_files_do_not_stop_the_others(cli, capsys, tmp_path):
+    (tmp_path / 'bad.json').write_text('{oops')
+    (tmp_path / 'number.json').write_text('42')
+    (tmp_path / 'ok.txt').write_text('machine learning machine learning machine learning')
+
+    results = run_analyze(cli, capsys, tmp_path / 'bad.json', tmp_path / 'number.json',
+                          tmp_path / 'ok.txt', tmp_path / 'missing.txt')
+
+    assert [result['success'] for result in results] == [False, False, True, False]
+    assert [result.get('error') for result in results] == [
+        'UnreadableTranscript', 'UnreadableTranscript', None, 'FileNotFoundError'
+    ]
+    assert results[2]['keywords'] == {'machine': 3, 'learning': 3}
+
+def test_phrases_across_batches_are_counted(cli, capsys, tmp_path):
+    from keywords import MIN_WORD_LENGTH, count_terms, frequent_words
+    from languages import language_stop_words
+    from transcript_files import COUNT_BATCH_CHARS
+
+    # Every line ends mid-phrase, so each batch boundary splits a few phrases
+    lines = ['machine learning models', 'deep neural networks', 'gradient descent steps']
+    text = '\n'.join(lines * (3 * COUNT_BATCH_CHARS // 60))
+    (tmp_path / 'big.txt').write_text(text)
+
+    result, = run_analyze(cli, capsys, tmp_path / 'big.txt', '-n', 3, '-m', 1)
+
+    expected = count_terms(text, language_stop_words('en'), MIN_WORD_LENGTH, 3)
+    assert result['keywords'] == frequent_words(expected, 1)
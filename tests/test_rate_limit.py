@@ -0,0 +1,146 @@
+import socket
+import threading
+import time
+import urllib.error
+
+import pytest
+
+from fakes import FakeBackend, make_transcriber, urls
+from rate_limit import Fetcher, TokenBucket, is_retryable, is_throttled
+
+def too_many_requests(retry_after=None):
+    headers = {'Retry-After': retry_after} if retry_after else {}
+    return urllib.error.HTTPError('https://www.youtube.com', 429, 'Too Many Requests', headers, None)
+
+class TooManyRequests(Exception):
+    """Named like youtube_transcript_api's exception, which is matched by name."""
+
+def test_classifies_errors():
+    assert is_throttled(too_many_requests()) and is_retryable(too_many_requests())
+    assert is_throttled(TooManyRequests()) and is_retryable(TooManyRequests())
+    assert is_retryable(ConnectionResetError()) and not is_throttled(ConnectionResetError())
+    assert not is_retryable(urllib.error.HTTPError('u', 404, 'Not Found', {}, None))
+    assert not is_retryable(ValueError('No transcript'))
+
+def test_retries_network_errors_only():
+    assert is_retryable(TimeoutError()) and is_retryable(socket.gaierror())
+    assert is_retryable(urllib.error.URLError(ConnectionRefusedError()))
+    assert not is_retryable(FileNotFoundError('cache.sqlite3'))
+    assert not is_retryable(PermissionError())
+
+    fetcher = Fetcher(rate=0, retries=3, base_delay=0)
+    calls = []
+
+    def missing():
+        calls.append(1)
+        raise FileNotFoundError('cache.sqlite3')
+
+    with pytest.raises(FileNotFoundError):
+        fetcher.call(missing)
+    assert len(calls) == 1
+
+def test_retries_throttled_and_transient_failures():
+    fetcher = Fetcher(rate=0, retries=3, base_delay=0)
+    failures = [too_many_requests(), ConnectionResetError(), TooManyRequests()]
+
+    def flaky():
+        if failures:
+            raise failures.pop(0)
+        return 'ok'
+
+    assert fetcher.call(flaky) == 'ok'
+    stats = fetcher.stats()
+    assert stats['requests'] == 4
+    assert stats['retries'] == 3
+    assert stats['throttled'] == 2
+
+def test_gives_up_after_the_retries_and_on_permanent_errors():
+    fetcher = Fetcher(rate=0, retries=2, base_delay=0)
+    calls = []
+
+    def always_throttled():
+        calls.append(1)
+        raise too_many_requests()
+
+    with pytest.raises(urllib.error.HTTPError):
+        fetcher.call(always_throttled)
+    assert len(calls) == 3
+
+    def missing():
+        calls.append(1)
+        raise ValueError('No transcript')
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        fetcher.call(missing)
+    assert len(calls) == 1
+
+def test_backoff_is_capped_and_honours_retry_after():
+    fetcher = Fetcher(base_delay=1.0, max_delay=8.0)
+    assert all(0 <= fetcher.backoff(attempt) <= min(8.0, 2 ** attempt) for attempt in range(10))
+    assert fetcher.backoff(0, too_many_requests('5')) >= 5.0
+    assert fetcher.backoff(0, too_many_requests('600')) <= 8.0
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=50, burst=2)
+
+    start = time.perf_counter()
+    for _ in range(7):
+        bucket.acquire()
+    elapsed = time.perf_counter() - start
+
+    # Two tokens are available at once, the other five come 20ms apart
+    assert 0.09 <= elapsed < 0.5
+
+def test_coalesces_concurrent_and_recent_calls():
+    fetcher = Fetcher(rate=0)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetcher.coalesce('key', fetch))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 4
+    assert fetcher.coalesce('key', fetch) == 'value'
+    assert len(calls) == 1
+    assert fetcher.stats()['coalesced'] == 4
+
+def test_without_memory_only_concurrent_calls_are_shared():
+    fetcher = Fetcher(rate=0, remember=0)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert fetcher.coalesce('key', fetch) == 1
+    assert fetcher.coalesce('key', fetch) == 2
+
+def test_transcriber_retries_a_throttled_video(cli):
+    backend = FakeBackend(failures={
+        ('transcript', 'v1'): [too_many_requests(), ConnectionResetError()],
+        ('metadata', 'v2'): [TooManyRequests()]
+    })
+    fetcher = Fetcher(rate=0, retries=3, base_delay=0)
+    transcriber = make_transcriber(cli, backend, proofread=False, fetcher=fetcher)
+
+    results = list(transcriber.process_videos(urls('v1', 'v2', 'v1'), 2, 'json'))
+
+    assert [result['success'] for result in results] == [True] * 3
+    assert backend.calls['transcript', 'v1'] == 3
+    assert backend.calls['metadata', 'v2'] == 2
+    stats = fetcher.stats()
+    assert stats['retries'] == 3
+    assert stats['throttled'] == 2
+    assert stats['coalesced'] == 2
@@ -0,0 +1,135 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from analysis_service import AnalysisService, QueueFull, make_server
+from fakes import FakeBackend, make_transcriber, urls
+from rate_limit import Fetcher
+
+@pytest.fixture
+def serve(cli):
+    """Start a service over a fake backend on a free port; returns (service, post, get)."""
+    running = []
+
+    def start(backend, workers=1, queue_size=4, max_batch=10):
+        transcriber = make_transcriber(cli, backend, fetcher=Fetcher(rate=0, remember=0))
+        service = AnalysisService(transcriber, workers, queue_size, max_batch)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        running.append((server, service))
+        host, port = server.server_address[:2]
+
+        def request(method, path, body=None, headers=None):
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            try:
+                connection.request(method, path, body, headers or {})
+                response = connection.getresponse()
+                return response.status, json.loads(response.read() or b'null'), response
+            finally:
+                connection.close()
+
+        def post(body):
+            return request('POST', '/analyze', json.dumps(body))
+
+        return service, post, request
+
+    yield start
+    for server, service in running:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+def test_analyzes_one_video(serve):
+    _, post, _ = serve(FakeBackend())
+
+    status, result, _ = post({'url': 'https://youtu.be/v1', 'min_occurrences': 2})
+
+    assert status == 200
+    assert result['video_id'] == 'v1'
+    assert result['keywords'] == {'machine': 3, 'learning': 3}
+    assert result['transcript']['correction_count'] == 1
+
+def test_batch_results_keep_request_order(serve):
+    _, post, _ = serve(FakeBackend(transcripts={'gone': None}))
+    video_urls = urls('v1', 'gone', 'v2', 'v1') + ['not a url']
+
+    status, body, _ = post({'urls': video_urls})
+
+    assert status == 200
+    assert [result['video_url'] for result in body['results']] == video_urls
+    assert [result['success'] for result in body['results']] == [True, False, True, True, False]
+
+@pytest.mark.parametrize('body, status', [
+    ({'urls': []}, 400),
+    ({'url': 3}, 400),
+    ({'url': 'https://youtu.be/v1', 'min_occurrences': 0}, 400),
+    ([1, 2], 400),
+    ({'urls': urls(*(f'v{i}' for i in range(11)))}, 413),
+])
+def test_rejects_invalid_requests(serve, body, status):
+    _, post, _ = serve(FakeBackend())
+    assert post(body)[0] == status
+
+@pytest.mark.parametrize('length', ['abc', '-1'])
+def test_rejects_invalid_content_length(serve, length):
+    _, _, request = serve(FakeBackend())
+    status, body, _ = request('POST', '/analyze', None, {'Content-Length': length})
+    assert status == 400
+    assert body['error'] == 'Invalid Content-Length'
+
+def test_unknown_path(serve):
+    _, _, request = serve(FakeBackend())
+    assert request('GET', '/nope')[0] == 404
+
+def test_full_queue_is_turned_away(serve):
+    gate = threading.Event()
+    service, post, _ = serve(FakeBackend(gate=gate), workers=1, queue_size=1)
+
+    statuses = []
+    threads = []
+    for i in range(2):
+        threads.append(threading.Thread(target=lambda i=i: statuses.append(post({'url': f'https://youtu.be/v{i}'})[0])))
+        threads[-1].start()
+        # The first request is taken by the worker, the second waits in the queue
+        deadline = time.monotonic() + 5
+        while service.status()['busy_workers'] + service.status()['queued'] < i + 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    status, body, response = post({'url': 'https://youtu.be/v9'})
+    assert status == 503
+    assert response.getheader('Retry-After') == '1'
+    with pytest.raises(QueueFull):
+        service.submit(urls('v9'))
+
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200, 200]
+    assert service.stats.snapshot()['rejected'] == 2
+
+def test_state_stays_warm_and_stats_add_up(serve):
+    backend = FakeBackend()
+    service, post, request = serve(backend)
+
+    for _ in range(3):
+        assert post({'urls': urls('v1', 'v2')})[0] == 200
+
+    # The same checker served every request, and nothing was fetched from a stale memory
+    checker = service.transcriber.language_tool
+    assert len(checker.checked) >= 1
+    assert backend.calls['transcript', 'v1'] == 3
+
+    status, stats, _ = request('GET', '/stats')
+    assert status == 200
+    assert stats['requests'] == 3
+    assert stats['videos'] == 6
+    assert stats['failed_videos'] == 0
+    assert stats['latency_ms']['p50'] is not None
+    assert stats['throughput']['videos_per_second'] > 0
+    assert stats['fetcher']['requests'] == 12
+
+    status, health, _ = request('GET', '/health')
+    assert status == 200 and health['status'] == 'ok'
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'youtube-transcriber.py')
+
+# As in benchmarks/run_benchmarks.py: modules the CLI must not import unless a command needs them
+HEAVY_MODULES = ('pytube', 'youtube_transcript_api', 'language_tool_python', 'asyncio', 'numpy', 'sqlite3',
+                 'concurrent.futures')
+
+def loaded_heavy_modules(*statements):
+    """Load the CLI in a fresh interpreter, run the statements and return the heavy modules it imported."""
+    code = '\n'.join([
+        'import importlib.util, json, sys',
+        f'sys.path.insert(0, {ROOT!r})',
+        f"spec = importlib.util.spec_from_file_location('youtube_transcriber', {SCRIPT!r})",
+        'cli = importlib.util.module_from_spec(spec)',
+        'spec.loader.exec_module(cli)',
+        *statements,
+        f'print(json.dumps(sorted(set({HEAVY_MODULES!r}) & set(sys.modules))))',
+    ])
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+def test_import_loads_no_heavy_modules():
+    assert loaded_heavy_modules() == []
+
+def test_analyze_loads_no_heavy_modules(tmp_path):
+    path = tmp_path / 'script.txt'
+    path.write_text('machine learning models\nmachine learning\n')
+
+    assert loaded_heavy_modules(
+        'try:\n    cli.analyze_main(["--help"])\nexcept SystemExit:\n    pass',
+        f'cli.analyze_main([{str(path)!r}, "-n", "2"])',
+    ) == []
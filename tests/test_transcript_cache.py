@@ -0,0 +1,38 @@
+from transcript_cache import TranscriptCache
+
+def stored_totals(path):
+    cache = TranscriptCache(path)
+    try:
+        return cache.stats()['entries'], cache.stats()['bytes']
+    finally:
+        cache.close()
+
+def test_totals_follow_other_connections(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    first = TranscriptCache(path)
+    second = TranscriptCache(path)
+
+    first.put('a', 'transcript', 'machine learning ' * 100)
+    second.put('b', 'transcript', 'deep learning ' * 100)
+    first.put('c', 'transcript', 'neural networks ' * 100)
+
+    assert first.stats()['entries'] == second.stats()['entries'] == 3
+    assert first.stats()['bytes'] == second.stats()['bytes'] == stored_totals(path)[1]
+    first.close()
+    second.close()
+
+def test_eviction_counts_entries_from_other_connections(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    writer = TranscriptCache(path)
+    writer.put('a', 'transcript', 'machine learning')
+    size = writer.stats()['bytes']
+
+    # Room for two entries, but only the third write through this connection knows about the others
+    limited = TranscriptCache(path, max_bytes=2 * size)
+    writer.put('b', 'transcript', 'machine learning')
+    limited.put('c', 'transcript', 'machine learning')
+
+    assert stored_totals(path) == (2, 2 * size)
+    assert limited.get('a', 'transcript') is None
+    writer.close()
+    limited.close()
@@ -0,0 +1,175 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'youtube-transcriber',
+    'cache.sqlite3'
+)
+DEFAULT_TTL = 30 * 24 * 60 * 60  # 30 days
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+# Access times are only refreshed once they are this old, so cache hits
+# don't each rewrite the access index and commit
+ACCESS_RESOLUTION = 60 * 60
+
+class TranscriptCache:
+    """Persistent on-disk cache of transcripts and video metadata keyed by video ID.
+
+    Entries are stored zlib-compressed in a single SQLite file. Entries older
+    than ``ttl`` seconds are treated as missing, and once the stored data
+    grows past ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, refresh=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Batch mode fetches from worker threads, so share one connection behind a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                video_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (video_id, kind)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries (created)")
+        self._conn.commit()
+        self._version = None
+        self._sync_totals()
+
+    def _sync_totals(self):
+        """Count the entries and their size again if another connection has written to the file.
+
+        Otherwise the totals are kept up to date by put and _evict, so
+        writes need no full-table SUM.
+        """
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._entries, self._bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            self._version = version
+
+    def get(self, video_id, kind):
+        """Return the cached value for a video, or None on a miss.
+
+        With ``refresh`` set every lookup is a miss, so values are fetched
+        again and overwritten.
+        """
+        if self.refresh:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created, accessed FROM entries WHERE video_id = ? AND kind = ?",
+                (video_id, kind)
+            ).fetchone()
+
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+
+            if now - row[2] > ACCESS_RESOLUTION:
+                self._conn.execute(
+                    "UPDATE entries SET accessed = ? WHERE video_id = ? AND kind = ?",
+                    (now, video_id, kind)
+                )
+                self._conn.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def put(self, video_id, kind, value):
+        """Store a JSON-serializable value for a video and evict old entries."""
+        data = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            # Take the write lock first, so other processes sharing the file can't change the totals meanwhile
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync_totals()
+                old = self._conn.execute(
+                    "SELECT size FROM entries WHERE video_id = ? AND kind = ?", (video_id, kind)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (video_id, kind, data, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                    (video_id, kind, data, len(data), now, now)
+                )
+                if old is None:
+                    self._entries += 1
+                    self._bytes += len(data)
+                else:
+                    self._bytes += len(data) - old[0]
+                self._evict(now)
+            except BaseException:
+                self._conn.rollback()
+                # The totals may include the rolled back write, so count them again next time
+                self._version = None
+                raise
+            self._conn.commit()
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used ones until under max_bytes.
+
+        Both lookups walk an index, so a write only touches the rows it evicts.
+        """
+        if self.ttl is not None:
+            expired, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE created < ?", (now - self.ttl,)
+            ).fetchone()
+            if expired:
+                self._conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+                self._entries -= expired
+                self._bytes -= size
+
+        if self.max_bytes is None or self._bytes <= self.max_bytes:
+            return
+
+        evicted = []
+        for video_id, kind, size in self._conn.execute("SELECT video_id, kind, size FROM entries ORDER BY accessed"):
+            if self._bytes <= self.max_bytes:
+                break
+            evicted.append((video_id, kind))
+            self._entries -= 1
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE video_id = ? AND kind = ?", evicted)
+
+    def stats(self):
+        """Return hit/miss counters and the current size of the cache."""
+        with self._lock:
+            self._sync_totals()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': self._entries,
+                'bytes': self._bytes
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,245 @@
+import io
+import os
+import itertools
+import json
+import re
+import zipfile
+from keywords import MIN_WORD_LENGTH, STOP_WORDS, count_terms_stream
+from languages import detect_language, language_stop_words
+from parallel_counting import PARALLEL_MIN_CHARS, pack_counts, run_bounded, unpack_counts
+
+TRANSCRIPT_EXTENSIONS = ('.txt', '.srt', '.vtt', '.json')
+
+# "0:01", "12:34" or "1:02:03.500" on a line of its own, as in copied YouTube transcripts
+TIMESTAMP_LINE = re.compile(r'^\s*\[?\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?\]?\s*$')
+LEADING_TIMESTAMP = re.compile(r'^\s*\[?\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?\]?\s+')
+
+# Formatting and inline timing tags such as <i> or <00:00:01.000><c>
+MARKUP_TAG = re.compile(r'<[^>]*>')
+
+# Count in batches of roughly this many characters to bound memory per file
+COUNT_BATCH_CHARS = 1 << 16
+
+class UnreadableTranscript(ValueError):
+    """Raised for a transcript file that can't be parsed, such as malformed or unexpected JSON."""
+
+def iter_caption_lines(lines):
+    """Yield the spoken text lines of an SRT or WebVTT file.
+
+    Cue numbers, WebVTT cue identifiers, timing lines, headers and
+    NOTE/STYLE/REGION blocks are dropped.
+    """
+    block = []
+    skip_block = False
+
+    for line in lines:
+        line = line.strip()
+
+        if not line:
+            if not skip_block:
+                yield from block
+            block = []
+            skip_block = False
+            continue
+
+        if not block and (line.startswith('WEBVTT') or line.split(' ', 1)[0] in ('NOTE', 'STYLE', 'REGION')):
+            skip_block = True
+        elif '-->' in line:
+            # Anything before the timing line is a cue number or identifier
+            block = []
+        else:
+            text = MARKUP_TAG.sub('', line).strip()
+            if text:
+                block.append(text)
+
+    if not skip_block:
+        yield from block
+
+def iter_text_lines(lines):
+    """Yield the lines of a plain-text transcript with timestamps removed."""
+    for line in lines:
+        if TIMESTAMP_LINE.match(line):
+            continue
+        line = LEADING_TIMESTAMP.sub('', line).strip()
+        if line:
+            yield line
+
+def iter_json_lines(stream):
+    """Yield the text of a JSON transcript.
+
+    Supports the YouTubeTranscriptApi segment list, YouTube's json3 caption
+    format and the JSON output of youtube-transcriber.py. Raises
+    UnreadableTranscript for invalid JSON or JSON of any other shape.
+    """
+    try:
+        data = json.load(stream)
+    except ValueError as e:
+        raise UnreadableTranscript(f'invalid JSON: {e}') from None
+
+    if isinstance(data, dict):
+        if 'events' in data:
+            if not isinstance(data['events'], list):
+                raise UnreadableTranscript('"events" is not a list')
+            for event in data['events']:
+                segs = event.get('segs') if isinstance(event, dict) else None
+                if not isinstance(segs, list):
+                    continue
+                text = ''.join(str(seg.get('utf8', '')) for seg in segs if isinstance(seg, dict)).strip()
+                if text:
+                    yield text
+            return
+        transcript = data.get('transcript')
+        if isinstance(transcript, dict):
+            transcript = transcript.get('original')
+        if isinstance(transcript, str):
+            yield transcript
+            return
+        data = transcript or data.get('segments', [])
+
+    if not isinstance(data, list):
+        raise UnreadableTranscript('expected a list of transcript segments')
+
+    for item in data:
+        text = str(item.get('text', '')) if isinstance(item, dict) else str(item)
+        if text.strip():
+            yield text.strip()
+
+def iter_transcript_lines(name, data):
+    """Yield the spoken text of a transcript file given its name and raw bytes."""
+    extension = os.path.splitext(name)[1].lower()
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig', errors='replace')
+
+    if extension in ('.srt', '.vtt'):
+        return iter_caption_lines(stream)
+    if extension == '.json':
+        return iter_json_lines(stream)
+    return iter_text_lines(stream)
+
+def iter_uploads(files):
+    """Yield (name, bytes) for every transcript among the uploaded files, unpacking zip archives one member at a time."""
+    for f in files:
+        if f.name.lower().endswith('.zip'):
+            with zipfile.ZipFile(f) as archive:
+                for info in archive.infolist():
+                    name = info.filename
+                    if info.is_dir() or name.startswith('__MACOSX/') or not name.lower().endswith(TRANSCRIPT_EXTENSIONS):
+                        continue
+                    yield name, archive.read(info)
+        elif f.name.lower().endswith(TRANSCRIPT_EXTENSIONS):
+            yield f.name, f.getvalue()
+
+def count_uploads(files):
+    """Return how many transcripts iter_uploads will yield, without reading them."""
+    total = 0
+    for f in files:
+        if f.name.lower().endswith('.zip'):
+            with zipfile.ZipFile(f) as archive:
+                total += sum(
+                    1 for info in archive.infolist()
+                    if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+                    and info.filename.lower().endswith(TRANSCRIPT_EXTENSIONS)
+                )
+            f.seek(0)
+        elif f.name.lower().endswith(TRANSCRIPT_EXTENSIONS):
+            total += 1
+    return total
+
+def count_transcript(name, data, stop_words=STOP_WORDS, max_n=1, max_terms=None, language=None):
+    """Parse and count one transcript file in bounded batches.
+
+    Returns the name, the term counts, the total number of words and the
+    counting stats described in keywords.count_terms. With a language,
+    stop_words are extra words added to that language's stop list, and
+    'auto' detects the language from the first batch; the stats then
+    include the language.
+    """
+    word_count = 0
+
+    def batches():
+        nonlocal word_count
+        batch = []
+        batch_chars = 0
+        for line in iter_transcript_lines(name, data):
+            batch.append(line)
+            batch_chars += len(line)
+            if batch_chars >= COUNT_BATCH_CHARS:
+                text = ' '.join(batch)
+                word_count += len(text.split())
+                yield text
+                batch = []
+                batch_chars = 0
+
+        if batch:
+            text = ' '.join(batch)
+            word_count += len(text.split())
+            yield text
+
+    chunks = batches()
+    first = next(chunks, '')
+    detected = None
+    if language is None:
+        active_stop_words = stop_words
+    else:
+        detected = detect_language(first) if language == 'auto' else language
+        active_stop_words = language_stop_words(detected) | stop_words
+
+    # One continuous stream, so phrases running across two batches are still counted
+    stats = {}
+    counts = count_terms_stream(itertools.chain([first], chunks), active_stop_words, MIN_WORD_LENGTH, max_n,
+                                max_terms, stats)
+
+    if language is not None:
+        stats['language'] = detected
+    return name, counts, word_count, stats
+
+def _count_transcript_packed(name, data, stop_words, max_n, max_terms, language):
+    try:
+        name, counts, word_count, stats = count_transcript(name, data, stop_words, max_n, max_terms, language)
+    except UnreadableTranscript:
+        return name, None, 0, None
+    return name, pack_counts(counts), word_count, stats
+
+def count_transcripts(items, stop_words=STOP_WORDS, max_n=1, max_terms=None, max_workers=None, on_progress=None,
+                      language=None, unreadable=None):
+    """Count many (name, bytes) transcripts across a process pool.
+
+    See count_transcript for stop_words and language.
+
+    The input is consumed lazily and results come back in input order.
+    Workers return their counts packed by parallel_counting.pack_counts.
+    If the transcripts add up to less than PARALLEL_MIN_CHARS bytes they
+    are counted in-process instead. on_progress(done) is called after each
+    file finishes. Files that can't be parsed are left out of the results
+    and their names appended to the unreadable list, if one is given.
+    """
+    items = iter(items)
+
+    # Read ahead until there is enough to be worth starting workers for
+    head = []
+    size = 0
+    for name, data in items:
+        head.append((name, data))
+        size += len(data)
+        if size >= PARALLEL_MIN_CHARS:
+            break
+    else:
+        results = []
+        for done, (name, data) in enumerate(head, 1):
+            try:
+                results.append(count_transcript(name, data, stop_words, max_n, max_terms, language))
+            except UnreadableTranscript:
+                if unreadable is not None:
+                    unreadable.append(name)
+            if on_progress:
+                on_progress(done)
+        return results
+
+    tasks = ((name, data, stop_words, max_n, max_terms, language) for name, data in itertools.chain(head, items))
+    results = []
+    for name, packed, word_count, stats in run_bounded(_count_transcript_packed, tasks, max_workers, on_progress):
+        if packed is None:
+            if unreadable is not None:
+                unreadable.append(name)
+        else:
+            results.append((name, unpack_counts(*packed), word_count, stats))
+    return results
@@ -1,17 +1,84 @@
 import os
-import re
 import sys
 import argparse
-from collections import Counter
+import io
+import itertools
 import json
 from urllib.parse import urlparse, parse_qs
-import language_tool_python
-from pytube import YouTube
-from youtube_transcript_api import YouTubeTranscriptApi
+from keywords import (MIN_WORD_LENGTH, STOP_WORDS, analyze_keywords, count_terms_stream, frequent_words, iter_chunks,
+                      load_stop_words)
+from languages import base_language, detect_language, language_stop_words, languagetool_code
+from proofreading import close_shared_pools, proofread, shared_pool
+from segments import TranscriptSegments, format_time
+
+# pytube, youtube_transcript_api, asyncio and the cache, corpus, metrics and
+# service modules are imported where they are used, so the analyze subcommand
+# and other local-only runs start without loading them
+
+class YouTubeBackend:
+    """Downloads transcripts and video metadata from YouTube.
+
+    YouTubeTranscriber calls a backend for everything it fetches over the
+    network, so an object with the same two methods can stand in for
+    YouTube, e.g. to run the analysis service against canned transcripts.
+    """
+
+    def fetch_transcript(self, video_id, language='en'):
+        """Return the transcript pieces of a video and their language code, None for the default English.
+
+        With language 'auto' the creator's transcript is preferred over an
+        automatic one, in whatever language it is.
+        """
+        from youtube_transcript_api import YouTubeTranscriptApi
+        
+        if language == 'auto':
+            # Prefer a transcript uploaded by the creator over an automatic one, in whatever language
+            transcripts = sorted(YouTubeTranscriptApi.list_transcripts(video_id), key=lambda t: t.is_generated)
+            if not transcripts:
+                raise ValueError('No transcripts available')
+            return transcripts[0].fetch(), transcripts[0].language_code
+        if language == 'en':
+            return YouTubeTranscriptApi.get_transcript(video_id), None
+        return YouTubeTranscriptApi.get_transcript(video_id, languages=[language]), language
+
+    def fetch_metadata(self, video_id):
+        """Return the title, channel and ISO publish date of a video."""
+        from pytube import YouTube
+        
+        yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
+        return {
+            'title': yt.title,
+            'channel': yt.author,
+            'published': yt.publish_date.isoformat() if yt.publish_date else None
+        }
 
 class YouTubeTranscriber:
-    def __init__(self):
-        self.language_tool = language_tool_python.LanguageTool('en-US')
+    def __init__(self, cache=None, proofread=True, checkers=1, language_tool_server=None, stop_words=STOP_WORDS,
+                 sort_by='count', background=None, collect_background=None, ngrams=1, max_terms=None,
+                 fetcher=None, corpus=None, metrics=None, language='en', duplicates=None, skip_duplicates=False,
+                 proofread_cache=None, backend=None):
+        # LanguageTool is only started on the first proofread_text call, and
+        # checkers for other languages only when a transcript in them turns up
+        self.default_checker_language = languagetool_code('en' if language == 'auto' else language)
+        self.language_tool = shared_pool(self.default_checker_language, checkers, language_tool_server) if proofread else None
+        self.language_tool_server = language_tool_server
+        self.language = language
+        self.checkers = checkers
+        self.cache = cache
+        self.proofread_cache = proofread_cache
+        self.fetcher = fetcher
+        self.backend = backend or YouTubeBackend()
+        self.corpus = corpus
+        self.metrics = metrics
+        self.duplicates = duplicates
+        self.skip_duplicates = skip_duplicates
+        self.stop_words = stop_words
+        self.extra_stop_words = stop_words - STOP_WORDS
+        self.sort_by = sort_by
+        self.background = background
+        self.collect_background = collect_background
+        self.ngrams = ngrams
+        self.max_terms = max_terms
     
     def extract_video_id(self, youtube_url):
         """Extract the video ID from a YouTube URL."""
@@ -31,16 +98,87 @@ class YouTubeTranscriber:
         # If we get here, we didn't find a valid video ID
         raise ValueError(f"Could not extract video ID from URL: {youtube_url}")
 
+    def fetch_segments(self, video_id):
+        """Fetch the timed transcript segments of a video by ID, raising on failure."""
+        # English transcripts keep their original cache key
+        kind = 'segments' if self.language == 'en' else f'segments:{self.language}'
+        return TranscriptSegments.from_dict(self._fetch(video_id, kind, self._download_segments))
+
+    def fetch_transcript(self, video_id):
+        """Fetch the transcript of a video by ID, raising on failure."""
+        return self.fetch_segments(video_id).text
+
+    def fetch_video_title(self, video_id):
+        """Fetch the title of a video by ID, raising on failure."""
+        return self.fetch_video_metadata(video_id)['title']
+
+    def fetch_video_metadata(self, video_id):
+        """Fetch the title, channel and ISO publish date of a video by ID, raising on failure."""
+        return self._fetch(video_id, 'metadata', self._download_video_metadata)
+
+    def _fetch(self, video_id, kind, download):
+        """Return a cached value or download it.
+
+        With a fetcher, duplicate requests for the same video share one
+        lookup, and only actual downloads are rate limited and retried.
+        """
+        if self.metrics is None:
+            return self._load(video_id, kind, download)
+        
+        with self.metrics.stage(video_id, f'fetch_{kind}') as stage:
+            value = self._load(video_id, kind, download, stage)
+            # Only a lookup of our own sets cache_hit; without one another request's fetch answered
+            stage['coalesced'] = 'cache_hit' not in stage
+            stage.setdefault('cache_hit', False)
+            return value
+
+    def _load(self, video_id, kind, download, stage=None):
+        def fetch():
+            if self.fetcher is not None:
+                value = self.fetcher.call(lambda: download(video_id))
+            else:
+                value = download(video_id)
+            if stage is not None:
+                stage['bytes'] = len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+            return value
+        
+        def load():
+            if stage is not None:
+                stage['cache_hit'] = False
+            if self.cache is None:
+                return fetch()
+            
+            value = self.cache.get(video_id, kind)
+            if value is None:
+                value = fetch()
+                self.cache.put(video_id, kind, value)
+            elif stage is not None:
+                stage['cache_hit'] = True
+            return value
+        
+        if self.fetcher is not None:
+            return self.fetcher.coalesce((kind, video_id), load)
+        return load()
+
+    def _download_segments(self, video_id):
+        transcript_list, language = self.backend.fetch_transcript(video_id, self.language)
+        
+        # Combine all transcript pieces into a single text, keeping their timing
+        return TranscriptSegments.from_transcript_list(transcript_list, language).to_dict()
+
+    def _download_video_metadata(self, video_id):
+        return self.backend.fetch_metadata(video_id)
+
     def get_transcript(self, youtube_url):
         """Get the transcript of a YouTube video."""
+        segments = self.get_segments(youtube_url)
+        return segments.text if segments is not None else None
+
+    def get_segments(self, youtube_url):
+        """Get the timed transcript segments of a YouTube video."""
         try:
             video_id = self.extract_video_id(youtube_url)
-            transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-            
-            # Combine all transcript pieces into a single text
-            transcript_text = ' '.join([item['text'] for item in transcript_list])
-            
-            return transcript_text
+            return self.fetch_segments(video_id)
         except Exception as e:
             print(f"Error getting transcript: {e}")
             return None
@@ -49,43 +187,78 @@ class YouTubeTranscriber:
         """Get the title of a YouTube video."""
         try:
             video_id = self.extract_video_id(youtube_url)
-            yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
-            return yt.title
+            return self.fetch_video_title(video_id)
         except Exception as e:
             print(f"Error getting video title: {e}")
             return "Unknown Video"
 
-    def proofread_text(self, text):
-        """Proofread the text using LanguageTool."""
+    def fetch_video(self, youtube_url):
+        """Fetch the title and transcript segments of a video, raising if the transcript is unavailable.
+
+        This is safe to call from worker threads; a missing title falls back to
+        "Unknown Video" just like get_video_title.
+        """
+        video_id = self.extract_video_id(youtube_url)
+        
         try:
-            matches = self.language_tool.check(text)
-            
-            # Create a corrected version of the text
-            corrected_text = text
-            offset = 0
-            
-            # Sort matches by their position in the text to avoid offsetting issues
-            for match in sorted(matches, key=lambda m: m.offset):
-                # Get the suggested replacement (if any)
-                if match.replacements:
-                    replacement = match.replacements[0]
-                    
-                    # Calculate the position considering previous corrections
-                    start = match.offset + offset
-                    end = match.offset + match.errorLength + offset
-                    
-                    # Replace the error with the correction
-                    corrected_text = corrected_text[:start] + replacement + corrected_text[end:]
-                    
-                    # Update the offset for future corrections
-                    offset += len(replacement) - match.errorLength
+            video_title = self.fetch_video_title(video_id)
+        except Exception:
+            video_title = "Unknown Video"
+        
+        segments = self.fetch_segments(video_id)
+        if not segments.text:
+            raise ValueError('Transcript is empty')
+        
+        return video_id, video_title, segments
+
+    def proofread_text(self, text, with_corrections=False, video_id=None, language=None):
+        """Proofread the text using LanguageTool.
+
+        With with_corrections, the result also lists each applied correction
+        as an (offset, length, replacement) tuple. The text is checked as
+        language, by default the transcriber's language. With a proofreading
+        cache, sentences checked before reuse their matches and the result
+        says how many did. With metrics enabled, the time taken is recorded
+        under video_id.
+        """
+        if self.metrics is not None and video_id is not None:
+            with self.metrics.stage(video_id, 'proofread') as stage:
+                result = self._proofread_text(text, with_corrections, language)
+                stage['characters'] = len(text)
+                stage['corrections'] = result['correction_count']
+                if 'sentence_cache' in result:
+                    stage['sentences'] = result['sentence_cache']['sentences']
+                    stage['sentence_hits'] = result['sentence_cache']['hits']
+                return result
+        return self._proofread_text(text, with_corrections, language)
+
+    def _proofread_text(self, text, with_corrections, language):
+        try:
+            # Check the text in sentence-aligned chunks and apply the corrections in one pass
+            corrections = [] if with_corrections else None
+            cache_stats = {} if self.proofread_cache is not None else None
+            code = languagetool_code(language) if language else self.default_checker_language
+            corrected_text, correction_count = proofread(
+                self.checker_for(language), text, max_workers=self.checkers, corrections=corrections,
+                cache=self.proofread_cache, language=code, cache_stats=cache_stats
+            )
             
             # Return both the original and corrected texts
-            return {
+            result = {
                 'original': text,
                 'corrected': corrected_text,
-                'correction_count': len(matches)
+                'correction_count': correction_count
             }
+            if with_corrections:
+                result['corrections'] = corrections
+            if cache_stats is not None:
+                sentences = cache_stats['sentences']
+                result['sentence_cache'] = {
+                    'sentences': sentences,
+                    'hits': cache_stats['hits'],
+                    'hit_ratio': round(cache_stats['hits'] / sentences, 4) if sentences else 0.0
+                }
+            return result
         except Exception as e:
             print(f"Error proofreading text: {e}")
             return {
@@ -94,38 +267,54 @@ class YouTubeTranscriber:
                 'correction_count': 0
             }
 
+    def checker_for(self, language=None):
+        """Return the LanguageTool pool for a language, created the first time it is needed."""
+        code = languagetool_code(language) if language else self.default_checker_language
+        if code == self.default_checker_language:
+            return self.language_tool
+        return shared_pool(code, self.checkers, self.language_tool_server)
+
+    def transcript_language(self, text, segments=None):
+        """Return the base language of a transcript: as fetched, as configured, or detected."""
+        if segments is not None and segments.language:
+            return base_language(segments.language)
+        if self.language == 'auto':
+            return detect_language(text)
+        return base_language(self.language)
+
+    def stop_words_for(self, language):
+        """Return the stop words of a language plus any extra stop words given by the user."""
+        if language == 'en':
+            return self.stop_words
+        return language_stop_words(language) | self.extra_stop_words
+
+    def find_duplicate(self, video_id, text):
+        """Return (original video ID, similarity) if the transcript nearly duplicates one processed earlier.
+
+        Returns None when near-duplicate detection is off. The first video of
+        a group of near-duplicates is the original; later ones match it.
+        """
+        if self.duplicates is None:
+            return None
+        if self.metrics is not None:
+            with self.metrics.stage(video_id, 'dedup') as stage:
+                duplicate = self.duplicates.check(video_id, text)
+                stage['characters'] = len(text)
+                return duplicate
+        return self.duplicates.check(video_id, text)
+
     def analyze_keywords(self, text, min_occurrences=3):
         """Analyze keywords that appear more than a specified number of times."""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove punctuation and special characters
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # Split into words
-        words = text.split()
-        
-        # Filter out common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
-            'has', 'have', 'had', 'be', 'been', 'being', 'in', 'on', 'at', 'to',
-            'for', 'with', 'by', 'about', 'like', 'from', 'of', 'that', 'this',
-            'these', 'those', 'it', 'its', 'it\'s', 'they', 'them', 'their',
-            'we', 'us', 'our', 'i', 'my', 'me', 'mine', 'you', 'your', 'yours'
-        }
-        
-        filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-        
-        # Count occurrences
-        word_counts = Counter(filtered_words)
-        
-        # Filter to words that appear more than min_occurrences times
-        frequent_words = {word: count for word, count in word_counts.items() if count >= min_occurrences}
-        
-        # Sort by frequency (descending)
-        sorted_words = dict(sorted(frequent_words.items(), key=lambda item: item[1], reverse=True))
+        stop_words = self.stop_words_for(self.transcript_language(text))
+        keywords, _ = analyze_keywords(text, min_occurrences, stop_words, self.ngrams, self.max_terms)
+        return keywords
+
+    def score_keywords(self, word_counts):
+        """Score every word of a transcript with the configured method against the background corpus."""
+        # NumPy is only needed when sorting by a score
+        from keyword_scoring import KeywordScorer
         
-        return sorted_words
+        return KeywordScorer([word_counts], background=self.background).score(0, self.sort_by)
 
     def process_video(self, youtube_url, min_occurrences=3, output_format='text'):
         """Process a YouTube video: get transcript, proofread, and analyze keywords."""
@@ -133,33 +322,108 @@ class YouTubeTranscriber:
         video_title = self.get_video_title(youtube_url)
         
         # Get transcript
-        transcript = self.get_transcript(youtube_url)
+        transcript = self.get_segments(youtube_url)
         
-        if not transcript:
+        if not transcript or not transcript.text:
+            if self.metrics is not None:
+                try:
+                    self.metrics.finish(self.extract_video_id(youtube_url), success=False)
+                except ValueError:
+                    pass
             return {
                 'success': False,
                 'message': 'Failed to retrieve transcript'
             }
         
-        # Proofread transcript
-        proofread_result = self.proofread_text(transcript)
+        return self.build_result(youtube_url, video_title, transcript, min_occurrences, output_format)
+
+    def build_result(self, youtube_url, video_title, transcript, min_occurrences=3, output_format='text',
+                     proofread_result=None):
+        """Proofread and analyze an already fetched transcript and format the result.
+
+        The transcript may be plain text or TranscriptSegments; with segments
+        the result also says when each keyword is spoken and where each
+        correction was made. Pass proofread_result to reuse a proofread_text
+        result computed earlier. A near-duplicate of an earlier transcript is
+        flagged, or with skip_duplicates reported as skipped without being
+        proofread or analyzed.
+        """
+        segments = None
+        if isinstance(transcript, TranscriptSegments):
+            segments = transcript
+            transcript = segments.text
+        
+        video_id = self.extract_video_id(youtube_url)
+        language = self.transcript_language(transcript, segments)
+        stop_words = self.stop_words_for(language)
+        
+        # Check for re-uploads and clips of videos already processed
+        duplicate = self.find_duplicate(video_id, transcript)
+        if duplicate is not None and self.skip_duplicates:
+            return self.build_duplicate(youtube_url, video_title, video_id, duplicate, output_format)
+        
+        # Proofread transcript, unless proofreading is disabled or already done
+        if proofread_result is None:
+            if self.language_tool is not None:
+                proofread_result = self.proofread_text(transcript, segments is not None, video_id, language)
+            else:
+                proofread_result = {
+                    'original': transcript,
+                    'corrected': None,
+                    'correction_count': None
+                }
         
         # Analyze keywords
-        keywords = self.analyze_keywords(transcript, min_occurrences)
+        if self.metrics is not None:
+            with self.metrics.stage(video_id, 'keywords') as stage:
+                keywords, word_counts, counting_stats, scores, timings = self._analyze(transcript, segments, min_occurrences, stop_words)
+                stage['characters'] = len(transcript)
+                stage['words'] = len(transcript.split())
+                stage['terms'] = len(word_counts)
+                stage['keywords'] = len(keywords)
+        else:
+            keywords, word_counts, counting_stats, scores, timings = self._analyze(transcript, segments, min_occurrences, stop_words)
+        
+        if self.collect_background is not None:
+            self.collect_background.add_document(word_counts)
+        
+        if self.corpus is not None:
+            self.record_video(video_id, video_title, transcript, word_counts)
         
         # Create result object
         result = {
             'success': True,
+            'video_id': video_id,
             'video_title': video_title,
             'video_url': youtube_url,
+            'language': language,
             'transcript': {
                 'original': proofread_result['original'],
                 'corrected': proofread_result['corrected'],
                 'correction_count': proofread_result['correction_count']
             },
-            'keywords': keywords
+            'keywords': keywords,
+            'keyword_counting': counting_stats
         }
         
+        if duplicate is not None:
+            result['duplicate_of'] = {'video_id': duplicate[0], 'similarity': duplicate[1]}
+        
+        if 'sentence_cache' in proofread_result:
+            result['transcript']['sentence_cache'] = proofread_result['sentence_cache']
+        
+        if scores is not None:
+            result['keyword_scores'] = {word: scores[word] for word in keywords}
+        
+        # Map keywords and corrections back to the time they were spoken
+        if segments is not None:
+            result['keyword_timings'] = timings
+            if 'corrections' in proofread_result:
+                result['transcript']['corrections'] = segments.map_corrections(proofread_result['corrections'])
+        
+        if self.metrics is not None:
+            result['metrics'] = self.metrics.finish(video_id)
+        
         # Format output based on preference
         if output_format == 'json':
             return result
@@ -167,47 +431,824 @@ class YouTubeTranscriber:
             output = []
             output.append(f"Title: {video_title}")
             output.append(f"URL: {youtube_url}")
+            if self.language != 'en':
+                output.append(f"Language: {language}")
+            if duplicate is not None:
+                output.append(f"Near-duplicate of: {duplicate[0]} (similarity {duplicate[1]:.2f})")
             output.append("\n--- ORIGINAL TRANSCRIPT ---")
             output.append(proofread_result['original'])
-            output.append("\n--- CORRECTED TRANSCRIPT ---")
-            output.append(proofread_result['corrected'])
-            output.append(f"\nCorrections made: {proofread_result['correction_count']}")
+            if proofread_result['corrected'] is not None:
+                output.append("\n--- CORRECTED TRANSCRIPT ---")
+                output.append(proofread_result['corrected'])
+                line = f"\nCorrections made: {proofread_result['correction_count']}"
+                if 'sentence_cache' in proofread_result:
+                    sentence_cache = proofread_result['sentence_cache']
+                    line += f" ({sentence_cache['hits']} of {sentence_cache['sentences']} sentences from the proofreading cache)"
+                output.append(line)
             output.append("\n--- KEYWORD ANALYSIS ---")
             
             if keywords:
                 for word, count in keywords.items():
-                    output.append(f"'{word}': {count} occurrences")
+                    line = f"'{word}': {count} occurrences"
+                    if scores is not None:
+                        line += f" ({self.sort_by} {scores[word]:.3f})"
+                    if timings and word in timings:
+                        timing = timings[word]
+                        line += f" [first {format_time(timing['first'])}, last {format_time(timing['last'])}"
+                        if timing['per_minute'] is not None:
+                            line += f", {timing['per_minute']}/min"
+                        line += "]"
+                    output.append(line)
             else:
                 output.append("No keywords found with the specified minimum occurrences.")
             
+            if self.ngrams > 1 or self.max_terms:
+                output.append(f"\nKeyword counting: {counting_stats['mode']}, "
+                              f"~{counting_stats['memory_bytes'] / 1024:.1f} KB, "
+                              f"counts overestimated by at most {counting_stats['error_bound']}")
+            
+            if self.metrics is not None:
+                stages = ', '.join(f"{name} {values['seconds']:.3f}s" for name, values in result['metrics']['stages'].items())
+                output.append(f"\nTiming: {result['metrics']['total_seconds']:.3f}s ({stages})")
+            
             return '\n'.join(output)
 
+    def _analyze(self, transcript, segments, min_occurrences, stop_words):
+        """Count keywords, then score them and find when they are spoken if configured."""
+        counting_stats = {}
+        keywords, word_counts = analyze_keywords(
+            transcript, min_occurrences, stop_words, self.ngrams, self.max_terms, counting_stats
+        )
+        
+        # Rank keywords by distinctiveness instead of raw frequency if requested
+        scores = None
+        if self.sort_by != 'count':
+            scores = self.score_keywords(word_counts)
+            keywords = dict(sorted(keywords.items(), key=lambda item: scores[item[0]], reverse=True))
+        
+        timings = None
+        if segments is not None:
+            timings = segments.keyword_timings(keywords, stop_words, self.ngrams)
+        
+        return keywords, word_counts, counting_stats, scores, timings
+
+    def record_video(self, video_id, video_title, transcript, word_counts):
+        """Add a video's word counts to the corpus store, with its channel and publish date if known."""
+        try:
+            metadata = self.fetch_video_metadata(video_id)
+        except Exception:
+            metadata = {}
+        
+        self.corpus.add_video(
+            video_id, word_counts,
+            title=video_title,
+            channel=metadata.get('channel'),
+            published=metadata.get('published'),
+            word_count=len(transcript.split())
+        )
+
+    def build_duplicate(self, youtube_url, video_title, video_id, duplicate, output_format='text'):
+        """Create the record of a near-duplicate video skipped without analysis."""
+        original, score = duplicate
+        result = {
+            'success': True,
+            'skipped': True,
+            'video_id': video_id,
+            'video_title': video_title,
+            'video_url': youtube_url,
+            'duplicate_of': {'video_id': original, 'similarity': score}
+        }
+        if self.metrics is not None:
+            result['metrics'] = self.metrics.finish(video_id)
+        
+        if output_format == 'json':
+            return result
+        return f"Title: {video_title}\nURL: {youtube_url}\nSkipped: near-duplicate of {original} (similarity {score:.2f})"
+
+    def build_error(self, youtube_url, error, output_format='text'):
+        """Create a per-video error record for a video that could not be processed."""
+        try:
+            video_id = self.extract_video_id(youtube_url)
+        except ValueError:
+            video_id = None
+        
+        result = {
+            'success': False,
+            'video_url': youtube_url,
+            'video_id': video_id,
+            'error': type(error).__name__,
+            'message': str(error)
+        }
+        if self.metrics is not None:
+            result['metrics'] = self.metrics.finish(video_id, success=False)
+        
+        if output_format == 'json':
+            return result
+        return f"URL: {youtube_url}\nError: {result['error']}: {result['message']}"
+
+    def process_videos(self, youtube_urls, min_occurrences=3, output_format='text', max_workers=4):
+        """Process many videos, yielding each result as soon as it is ready.
+
+        Titles and transcripts are fetched concurrently by a bounded pool of
+        worker threads. Proofreading and keyword analysis run on the calling
+        thread as each fetch completes, so results are yielded in completion
+        order rather than input order.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.fetch_video, url): url for url in youtube_urls}
+            
+            for future in as_completed(futures):
+                youtube_url = futures[future]
+                try:
+                    video_id, video_title, segments = future.result()
+                    yield self.build_result(youtube_url, video_title, segments, min_occurrences, output_format)
+                except Exception as e:
+                    yield self.build_error(youtube_url, e, output_format)
+
+    def process_videos_async(self, youtube_urls, min_occurrences=3, output_format='text',
+                             fetch_concurrency=8, proofread_concurrency=1, analyze_concurrency=1, queue_size=16):
+        """Return an async generator that processes many videos, yielding each result as soon as it is ready.
+
+        Fetching, proofreading and keyword analysis run as separate pipeline
+        stages with their own concurrency limits, connected by bounded queues.
+        """
+        from pipeline import VideoPipeline
+        
+        pipeline = VideoPipeline(
+            self, min_occurrences, output_format,
+            fetch_concurrency, proofread_concurrency, analyze_concurrency, queue_size
+        )
+        return pipeline.run(youtube_urls)
+
+def expand_urls(lines):
+    """Turn lines of input into video URLs, expanding playlist and channel URLs.
+
+    Blank lines and lines starting with '#' are skipped.
+    """
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith('#'):
+            continue
+        
+        parsed_url = urlparse(url)
+        if parsed_url.path == '/playlist':
+            from pytube import Playlist
+            yield from Playlist(url).video_urls
+        elif parsed_url.path.startswith(('/channel/', '/c/', '/user/', '/@')):
+            from pytube import Channel
+            yield from Channel(url).video_urls
+        else:
+            yield url
+
+def read_urls(source):
+    """Read video URLs from a file path, or from stdin when source is '-'."""
+    if source == '-':
+        return list(expand_urls(sys.stdin))
+    with open(source, encoding='utf-8') as f:
+        return list(expand_urls(f))
+
+def completed_video_ids(path):
+    """Return the IDs of videos already processed successfully in a JSON Lines output file.
+
+    A partially written last line, left behind by a crash, is truncated so
+    that new records can be appended cleanly.
+    """
+    if not os.path.exists(path):
+        return set()
+    
+    video_ids = set()
+    with open(path, 'r+b') as f:
+        end = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            end += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('success') and record.get('video_id'):
+                video_ids.add(record['video_id'])
+        f.truncate(end)
+    
+    return video_ids
+
+def skip_completed(youtube_urls, video_ids, transcriber):
+    """Drop URLs whose video ID is in video_ids; URLs without a valid ID are kept."""
+    remaining = []
+    for youtube_url in youtube_urls:
+        try:
+            if transcriber.extract_video_id(youtube_url) in video_ids:
+                continue
+        except ValueError:
+            pass
+        remaining.append(youtube_url)
+    return remaining
+
+def iterate_async(async_results):
+    """Iterate over an async generator from synchronous code, one item at a time."""
+    import asyncio
+    
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(async_results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(async_results.aclose())
+        loop.close()
+
+def write_results(results, output_format, out):
+    """Stream results to a file object as they arrive."""
+    if output_format == 'jsonl':
+        # One compact record per line, flushed as soon as it is ready
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')) + '\n')
+            out.flush()
+    elif output_format == 'json':
+        # Write a JSON array one element at a time so the output stays valid JSON
+        out.write('[')
+        for i, result in enumerate(results):
+            out.write(',\n' if i else '\n')
+            out.write(json.dumps(result, ensure_ascii=False, indent=2))
+            out.flush()
+        out.write('\n]\n')
+    else:
+        for i, result in enumerate(results):
+            if i:
+                out.write('\n' + '=' * 60 + '\n\n')
+            out.write(result + '\n')
+            out.flush()
+
 def main():
+    # Subcommands get their own parsers; anything else is the original single-URL/batch CLI
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+    
+    from rate_limit import Fetcher
+    from transcript_cache import DEFAULT_CACHE_PATH, DEFAULT_TTL, TranscriptCache
+    
     parser = argparse.ArgumentParser(description='YouTube Transcript Analyzer')
-    parser.add_argument('url', help='YouTube video URL')
+    parser.add_argument('url', nargs='?', help='YouTube video URL')
     parser.add_argument('-m', '--min-occurrences', type=int, default=3, 
                         help='Minimum number of occurrences for keyword analysis (default: 3)')
-    parser.add_argument('-o', '--output', choices=['text', 'json'], default='text',
-                        help='Output format (default: text)')
+    parser.add_argument('-o', '--output', choices=['text', 'json', 'jsonl'], default='text',
+                        help='Output format; jsonl writes one compact JSON record per video (default: text)')
     parser.add_argument('-f', '--file', help='Output file (default: print to console)')
+    parser.add_argument('-b', '--batch', metavar='URL_FILE',
+                        help="Process every URL (or playlist/channel URL) listed in a file, one per line; use '-' for stdin")
+    parser.add_argument('--resume', action='store_true',
+                        help='With --batch, -o jsonl and -f, skip videos already in the output file and append to it')
+    parser.add_argument('-w', '--workers', type=int, default=4,
+                        help='Number of concurrent fetches in batch mode (default: 4)')
+    parser.add_argument('-l', '--language', default='en',
+                        help="Transcript language code such as en, es or de, or 'auto' to take whichever "
+                             "transcript the video has and detect its language (default: en)")
+    parser.add_argument('--stop-words', metavar='FILE',
+                        help='File of extra stop words to ignore in keyword analysis')
+    parser.add_argument('-n', '--ngrams', type=int, choices=[1, 2, 3], default=1,
+                        help='Also count phrases of up to this many words (default: 1)')
+    parser.add_argument('--max-terms', type=int,
+                        help='Keep memory bounded by tracking only about this many top terms, with approximate counts')
+    parser.add_argument('-s', '--sort-by', choices=['count', 'tfidf', 'bm25', 'keyness'], default='count',
+                        help='Rank keywords by raw count or by a distinctiveness score against --background (default: count)')
+    parser.add_argument('--background', metavar='FILE',
+                        help='Background corpus JSON used for tfidf, bm25 and keyness scores')
+    parser.add_argument('--save-background', metavar='FILE',
+                        help='Save the word counts of every processed transcript as a background corpus JSON')
+    parser.add_argument('--corpus', metavar='DB',
+                        help="Add every processed video's word counts to a corpus database (see the corpus subcommand)")
+    parser.add_argument('--new-only', action='store_true',
+                        help='With --batch and --corpus, skip videos already in the corpus')
+    parser.add_argument('--near-duplicates', choices=['flag', 'skip'],
+                        help='Detect re-uploads, clips and compilations of videos already processed in the run; '
+                             'flag them in the output or skip them without proofreading or analysis')
+    parser.add_argument('--duplicate-threshold', type=float, default=0.8,
+                        help='Estimated share of shared three-word phrases that makes two transcripts '
+                             'near-duplicates (default: 0.8)')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Time each stage; adds a metrics section to each result and logs one JSON line per video to stderr')
+    parser.add_argument('--metrics-file', metavar='FILE',
+                        help='Also write run totals in the Prometheus text format to this file')
+    parser.add_argument('--no-proofread', action='store_true',
+                        help='Skip proofreading, so LanguageTool and Java are never started')
+    parser.add_argument('--languagetool-server', metavar='URL',
+                        help='Use an already running LanguageTool HTTP server, e.g. http://localhost:8081')
+    parser.add_argument('--checkers', type=int, default=1,
+                        help='Number of LanguageTool instances used to proofread chunks in parallel (default: 1)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='In batch mode, overlap fetching, proofreading and analysis as separate asyncio stages')
+    parser.add_argument('--rate', type=float, default=5.0,
+                        help='Maximum YouTube requests per second, 0 for no limit (default: 5)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries with exponential backoff for throttled or failed requests (default: 3)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the on-disk transcript and proofreading caches')
+    parser.add_argument('--no-proofread-cache', action='store_true',
+                        help='Send every sentence to LanguageTool instead of reusing the matches of sentences checked before')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached transcripts and titles and fetch them again')
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH,
+                        help=f'Location of the transcript cache (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 86400,
+                        help='Days before a cached transcript is fetched again (default: %(default)g)')
     
     args = parser.parse_args()
     
-    transcriber = YouTubeTranscriber()
-    result = transcriber.process_video(args.url, args.min_occurrences, args.output)
+    if not args.url and not args.batch:
+        parser.error('a video URL or --batch is required')
+    if args.resume and not (args.batch and args.file and args.output == 'jsonl'):
+        parser.error('--resume needs --batch, --file and --output jsonl')
+    if args.sort_by != 'count' and not args.background:
+        parser.error(f'--sort-by {args.sort_by} needs a --background corpus to compare against')
+    if args.new_only and not (args.batch and args.corpus):
+        parser.error('--new-only needs --batch and --corpus')
+    
+    background = None
+    collect_background = None
+    if args.background or args.save_background:
+        from keyword_scoring import BackgroundCorpus
+        
+        if args.background:
+            background = BackgroundCorpus.load(args.background)
+        if args.save_background:
+            collect_background = BackgroundCorpus()
+    
+    cache = None
+    if not args.no_cache:
+        cache = TranscriptCache(args.cache_path, ttl=args.cache_ttl * 86400, refresh=args.refresh)
+    
+    # Matches of already checked sentences are kept next to the transcript cache
+    proofread_cache = None
+    if not (args.no_cache or args.no_proofread_cache or args.no_proofread):
+        from proofread_cache import ProofreadCache, proofread_cache_path
+        proofread_cache = ProofreadCache(proofread_cache_path(args.cache_path))
+    
+    fetcher = Fetcher(rate=args.rate, retries=args.retries)
+    corpus = None
+    if args.corpus:
+        from corpus_store import CorpusStore
+        corpus = CorpusStore(args.corpus)
+    
+    duplicates = None
+    if args.near_duplicates:
+        from near_duplicates import NearDuplicateFilter
+        duplicates = NearDuplicateFilter(args.duplicate_threshold)
+    
+    metrics = None
+    if args.metrics or args.metrics_file:
+        from metrics import Metrics
+        metrics = Metrics()
+    if args.metrics:
+        import logging
+        logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stderr)
+    
+    try:
+        transcriber = YouTubeTranscriber(
+            cache=cache,
+            fetcher=fetcher,
+            proofread=not args.no_proofread,
+            checkers=args.checkers,
+            language_tool_server=args.languagetool_server,
+            stop_words=load_stop_words(args.stop_words) if args.stop_words else STOP_WORDS,
+            sort_by=args.sort_by,
+            background=background,
+            collect_background=collect_background,
+            ngrams=args.ngrams,
+            max_terms=args.max_terms,
+            corpus=corpus,
+            metrics=metrics,
+            language=args.language,
+            duplicates=duplicates,
+            skip_duplicates=args.near_duplicates == 'skip',
+            proofread_cache=proofread_cache
+        )
+        run(args, transcriber)
+        
+        if collect_background is not None:
+            collect_background.save(args.save_background)
+            print(f"Background corpus of {collect_background.documents} transcripts saved to {args.save_background}", file=sys.stderr)
+    finally:
+        if args.metrics_file:
+            extra = {'fetcher': fetcher.stats()}
+            if cache is not None:
+                extra['cache'] = cache.stats()
+            if proofread_cache is not None:
+                extra['proofread_cache'] = proofread_cache.stats()
+            metrics.write_prometheus(args.metrics_file, extra)
+        
+        stats = fetcher.stats()
+        print(f"Fetches: {stats['requests']} requests, {stats['retries']} retries, "
+              f"{stats['throttled']} throttled, {stats['coalesced']} coalesced", file=sys.stderr)
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Cache: {stats['hits']} hits, {stats['misses']} misses", file=sys.stderr)
+            cache.close()
+        if proofread_cache is not None:
+            stats = proofread_cache.stats()
+            print(f"Proofread cache: {stats['hits']} of {stats['hits'] + stats['misses']} sentences reused "
+                  f"({stats['hit_ratio']:.0%} hit ratio)", file=sys.stderr)
+            proofread_cache.close()
+        if duplicates is not None:
+            print(f"Near-duplicates: {duplicates.duplicates} of {len(duplicates.checked)} transcripts "
+                  f"{'skipped' if args.near_duplicates == 'skip' else 'flagged'}", file=sys.stderr)
+        if corpus is not None:
+            stats = corpus.stats()
+            print(f"Corpus: {stats['videos']} videos, {stats['terms']} terms", file=sys.stderr)
+            corpus.close()
+
+def run(args, transcriber):
+    """Process the URL or batch given on the command line and write the output."""
+    # JSON Lines records are the same dicts as JSON output, just written compactly
+    result_format = 'json' if args.output == 'jsonl' else args.output
+    
+    if args.batch:
+        urls = read_urls(args.batch)
+        
+        mode = 'w'
+        if args.resume:
+            done = completed_video_ids(args.file)
+            urls = skip_completed(urls, done, transcriber)
+            print(f"Resuming: {len(done)} videos already done, {len(urls)} to process", file=sys.stderr)
+            mode = 'a'
+        
+        if args.new_only:
+            before = len(urls)
+            urls = skip_completed(urls, transcriber.corpus.video_ids(), transcriber)
+            print(f"Skipping {before - len(urls)} videos already in the corpus, {len(urls)} to process", file=sys.stderr)
+        
+        if args.pipeline:
+            results = iterate_async(transcriber.process_videos_async(
+                urls, args.min_occurrences, result_format,
+                fetch_concurrency=args.workers,
+                proofread_concurrency=transcriber.checkers
+            ))
+        else:
+            results = transcriber.process_videos(urls, args.min_occurrences, result_format, args.workers)
+        
+        if args.file:
+            with open(args.file, mode, encoding='utf-8') as f:
+                write_results(results, args.output, f)
+            print(f"Results saved to {args.file}")
+        else:
+            write_results(results, args.output, sys.stdout)
+        return
+    
+    result = transcriber.process_video(args.url, args.min_occurrences, result_format)
+    
+    if args.output == 'jsonl':
+        output = json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+    elif args.output == 'json':
+        output = json.dumps(result, ensure_ascii=False, indent=2)
+    else:
+        output = result
     
     if args.file:
         with open(args.file, 'w', encoding='utf-8') as f:
-            if args.output == 'json':
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            else:
-                f.write(result)
+            f.write(output)
         print(f"Results saved to {args.file}")
     else:
-        if args.output == 'json':
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(output)
+
+def corpus_main(argv):
+    """Query a corpus database built with --corpus."""
+    parser = argparse.ArgumentParser(prog='youtube-transcriber.py corpus',
+                                     description='Query the keyword corpus built with --corpus')
+    parser.add_argument('database', help='Corpus database file')
+    parser.add_argument('-c', '--channel', help='Only include videos from this channel')
+    parser.add_argument('-o', '--output', choices=['text', 'json'], default='text',
+                        help='Output format (default: text)')
+    actions = parser.add_subparsers(dest='action', required=True)
+    
+    top = actions.add_parser('top', help='Most frequent terms across the corpus')
+    top.add_argument('-l', '--limit', type=int, default=50, help='Number of terms to show (default: 50)')
+    
+    common = actions.add_parser('common', help='Keywords shared by many videos')
+    common.add_argument('--min-videos', type=int, default=2,
+                        help='Minimum number of videos a keyword must appear in (default: 2)')
+    common.add_argument('-m', '--min-occurrences', type=int, default=3,
+                        help='Minimum occurrences in each of those videos (default: 3)')
+    
+    trend = actions.add_parser('trend', help="A term's use over time, by publish date")
+    trend.add_argument('term', help='Word or phrase to track')
+    trend.add_argument('-p', '--period', choices=['week', 'month', 'year'], default='month',
+                       help='Grouping period (default: month)')
+    
+    actions.add_parser('stats', help='Number of videos, channels and terms stored')
+    
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.database):
+        parser.error(f'corpus database {args.database} does not exist')
+    
+    from corpus_store import CorpusStore
+    
+    corpus = CorpusStore(args.database)
+    try:
+        if args.action == 'top':
+            result = corpus.top_terms(args.limit, args.channel)
+        elif args.action == 'common':
+            result = corpus.common_keywords(args.min_videos, args.min_occurrences, args.channel)
+        elif args.action == 'trend':
+            result = corpus.term_trend(args.term.lower(), args.period, args.channel)
         else:
-            print(result)
+            result = corpus.stats()
+    finally:
+        corpus.close()
+    
+    if args.output == 'json':
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif args.action == 'trend':
+        print(f"{'Period':<10} {'Videos':>7} {'Mention':>8} {'Count':>7} {'Per 1k':>8}")
+        for row in result:
+            per_1000 = '-' if row['per_1000_words'] is None else row['per_1000_words']
+            print(f"{row['period']:<10} {row['videos']:>7} {row['videos_mentioning']:>8} {row['occurrences']:>7} {per_1000:>8}")
+    elif args.action == 'stats':
+        for key, value in result.items():
+            print(f"{key.replace('_', ' ').capitalize()}: {value}")
+    else:
+        for term, count in result.items():
+            print(f"{term}: {count}")
+
+def read_transcript_file(path):
+    """Return (name, bytes) for a transcript path, reading stdin for '-'."""
+    if path == '-':
+        return '<stdin>', sys.stdin.buffer.read()
+    with open(path, 'rb') as f:
+        return path, f.read()
+
+def analyze_transcript_file(name, data, args, extra_stop_words, background=None):
+    """Count and rank the keywords of one local transcript, formatted like a video result."""
+    from transcript_files import count_transcript
+    
+    _, word_counts, word_count, counting_stats = count_transcript(
+        name, data, extra_stop_words, args.ngrams, args.max_terms, args.language
+    )
+    return format_analysis(name, word_counts, word_count, counting_stats, args, background)
+
+def analyze_text_stream(name, stream, args, extra_stop_words, background=None):
+    """Count and rank the keywords of a plain-text stream one piece at a time, for inputs too big for memory.
+
+    The counts are identical to reading the whole text and calling
+    analyze_keywords, but timestamps are not stripped as they are for
+    transcript files.
+    """
+    chunks = iter_chunks(stream)
+    first = next(chunks, '')
+    language = detect_language(first) if args.language == 'auto' else args.language
+    stop_words = language_stop_words(language) | extra_stop_words
+    
+    word_count = 0
+    
+    def counted_chunks():
+        nonlocal word_count
+        for chunk in itertools.chain([first], chunks):
+            word_count += len(chunk.split())
+            yield chunk
+    
+    counting_stats = {'language': language}
+    word_counts = count_terms_stream(counted_chunks(), stop_words, MIN_WORD_LENGTH, args.ngrams, args.max_terms, counting_stats)
+    return format_analysis(name, word_counts, word_count, counting_stats, args, background)
+
+def format_analysis(name, word_counts, word_count, counting_stats, args, background=None):
+    """Build the analyze subcommand's result for one transcript from its term counts."""
+    keywords = frequent_words(word_counts, args.min_occurrences)
+    
+    scores = None
+    if args.sort_by != 'count':
+        from keyword_scoring import KeywordScorer
+        
+        scores = KeywordScorer([word_counts], background=background).score(0, args.sort_by)
+        keywords = dict(sorted(keywords.items(), key=lambda item: scores[item[0]], reverse=True))
+    
+    language = counting_stats.pop('language')
+    result = {
+        'success': True,
+        'file': name,
+        'language': language,
+        'word_count': word_count,
+        'keywords': keywords,
+        'keyword_counting': counting_stats
+    }
+    if scores is not None:
+        result['keyword_scores'] = {word: scores[word] for word in keywords}
+    
+    if args.output != 'text':
+        return result
+    
+    output = [f"File: {name}"]
+    if args.language != 'en':
+        output.append(f"Language: {language}")
+    output.append(f"Words: {word_count}")
+    output.append("\n--- KEYWORD ANALYSIS ---")
+    if keywords:
+        for word, count in keywords.items():
+            line = f"'{word}': {count} occurrences"
+            if scores is not None:
+                line += f" ({args.sort_by} {scores[word]:.3f})"
+            output.append(line)
+    else:
+        output.append("No keywords found with the specified minimum occurrences.")
+    
+    if args.ngrams > 1 or args.max_terms:
+        output.append(f"\nKeyword counting: {counting_stats['mode']}, "
+                      f"~{counting_stats['memory_bytes'] / 1024:.1f} KB, "
+                      f"counts overestimated by at most {counting_stats['error_bound']}")
+    return '\n'.join(output)
+
+def analyze_main(argv):
+    """Analyze local transcript files or stdin, without YouTube, LanguageTool or the cache."""
+    parser = argparse.ArgumentParser(prog='youtube-transcriber.py analyze',
+                                     description='Analyze keywords in local transcripts (.txt, .srt, .vtt or .json)')
+    parser.add_argument('files', nargs='*', default=['-'],
+                        help="Transcript files; '-' or no files reads plain text from stdin")
+    parser.add_argument('-m', '--min-occurrences', type=int, default=3,
+                        help='Minimum number of occurrences for keyword analysis (default: 3)')
+    parser.add_argument('-o', '--output', choices=['text', 'json', 'jsonl'], default='text',
+                        help='Output format (default: text)')
+    parser.add_argument('-f', '--file', help='Output file (default: print to console)')
+    parser.add_argument('-n', '--ngrams', type=int, choices=[1, 2, 3], default=1,
+                        help='Also count phrases of up to this many words (default: 1)')
+    parser.add_argument('--max-terms', type=int,
+                        help='Keep memory bounded by tracking only about this many top terms, with approximate counts')
+    parser.add_argument('-l', '--language', default='en',
+                        help="Transcript language code such as en, es or de, or 'auto' to detect it (default: en)")
+    parser.add_argument('--stop-words', metavar='FILE',
+                        help='File of extra stop words to ignore in keyword analysis')
+    parser.add_argument('-s', '--sort-by', choices=['count', 'tfidf', 'bm25', 'keyness'], default='count',
+                        help='Rank keywords by raw count or by a distinctiveness score against --background (default: count)')
+    parser.add_argument('--background', metavar='FILE',
+                        help='Background corpus JSON used for tfidf, bm25 and keyness scores')
+    parser.add_argument('--stream', action='store_true',
+                        help='Treat inputs as plain text and count them in 1 MB pieces, so multi-GB files use bounded memory')
+    
+    args = parser.parse_args(argv)
+    
+    if args.sort_by != 'count' and not args.background:
+        parser.error(f'--sort-by {args.sort_by} needs a --background corpus to compare against')
+    
+    extra_stop_words = load_stop_words(args.stop_words, frozenset()) if args.stop_words else frozenset()
+    
+    background = None
+    if args.background:
+        from keyword_scoring import BackgroundCorpus
+        background = BackgroundCorpus.load(args.background)
+    
+    def results():
+        from transcript_files import UnreadableTranscript
+        
+        for path in args.files:
+            try:
+                if args.stream and path == '-':
+                    stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+                    yield analyze_text_stream('<stdin>', stream, args, extra_stop_words, background)
+                elif args.stream:
+                    with open(path, encoding='utf-8-sig', errors='replace') as stream:
+                        yield analyze_text_stream(path, stream, args, extra_stop_words, background)
+                else:
+                    name, data = read_transcript_file(path)
+                    yield analyze_transcript_file(name, data, args, extra_stop_words, background)
+            except (OSError, UnreadableTranscript) as e:
+                # One missing or malformed file is reported in its place without stopping the others
+                record = {'success': False, 'file': path, 'error': type(e).__name__, 'message': str(e)}
+                yield record if args.output != 'text' else f"File: {path}\nError: {record['error']}: {record['message']}"
+    
+    if args.file:
+        with open(args.file, 'w', encoding='utf-8') as f:
+            write_results(results(), args.output, f)
+        print(f"Results saved to {args.file}")
+    else:
+        write_results(results(), args.output, sys.stdout)
+
+def serve_main(argv):
+    """Serve analysis over HTTP from one long-lived transcriber."""
+    from analysis_service import DEFAULT_HOST, DEFAULT_PORT, AnalysisService, make_server
+    from rate_limit import Fetcher
+    from transcript_cache import DEFAULT_CACHE_PATH, DEFAULT_TTL, TranscriptCache
+    
+    parser = argparse.ArgumentParser(prog='youtube-transcriber.py serve',
+                                     description='Serve video analysis as a local HTTP/JSON service, keeping '
+                                                 'LanguageTool, caches and stop words loaded between requests')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address to listen on (default: {DEFAULT_HOST})')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Requests processed at the same time (default: 1)')
+    parser.add_argument('--queue-size', type=int, default=16,
+                        help='Requests waiting for a worker before new ones are turned away with 503 (default: 16)')
+    parser.add_argument('--max-batch', type=int, default=100,
+                        help='Most video URLs accepted in one request (default: 100)')
+    parser.add_argument('--fetch-workers', type=int, default=4,
+                        help='Concurrent fetches within one request (default: 4)')
+    parser.add_argument('-l', '--language', default='en',
+                        help="Transcript language code such as en, es or de, or 'auto' (default: en)")
+    parser.add_argument('--stop-words', metavar='FILE',
+                        help='File of extra stop words to ignore in keyword analysis')
+    parser.add_argument('-n', '--ngrams', type=int, choices=[1, 2, 3], default=1,
+                        help='Also count phrases of up to this many words (default: 1)')
+    parser.add_argument('--max-terms', type=int,
+                        help='Keep memory bounded by tracking only about this many top terms, with approximate counts')
+    parser.add_argument('-s', '--sort-by', choices=['count', 'tfidf', 'bm25', 'keyness'], default='count',
+                        help='Rank keywords by raw count or by a distinctiveness score against --background (default: count)')
+    parser.add_argument('--background', metavar='FILE',
+                        help='Background corpus JSON used for tfidf, bm25 and keyness scores')
+    parser.add_argument('--no-proofread', action='store_true',
+                        help='Skip proofreading, so LanguageTool and Java are never started')
+    parser.add_argument('--languagetool-server', metavar='URL',
+                        help='Use an already running LanguageTool HTTP server, e.g. http://localhost:8081')
+    parser.add_argument('--checkers', type=int, default=1,
+                        help='Number of LanguageTool instances used to proofread chunks in parallel (default: 1)')
+    parser.add_argument('--rate', type=float, default=5.0,
+                        help='Maximum YouTube requests per second, 0 for no limit (default: 5)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries with exponential backoff for throttled or failed requests (default: 3)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the on-disk transcript and proofreading caches')
+    parser.add_argument('--no-proofread-cache', action='store_true',
+                        help='Send every sentence to LanguageTool instead of reusing the matches of sentences checked before')
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH,
+                        help=f'Location of the transcript cache (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 86400,
+                        help='Days before a cached transcript is fetched again (default: %(default)g)')
+    parser.add_argument('--no-warm-up', action='store_true',
+                        help='Start LanguageTool on the first request instead of before serving')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every request to stderr')
+    args = parser.parse_args(argv)
+    
+    if args.sort_by != 'count' and not args.background:
+        parser.error(f'--sort-by {args.sort_by} needs a --background corpus to compare against')
+    
+    background = None
+    if args.background:
+        from keyword_scoring import BackgroundCorpus
+        background = BackgroundCorpus.load(args.background)
+    
+    cache = None
+    if not args.no_cache:
+        cache = TranscriptCache(args.cache_path, ttl=args.cache_ttl * 86400)
+    
+    proofread_cache = None
+    if not (args.no_cache or args.no_proofread_cache or args.no_proofread):
+        from proofread_cache import ProofreadCache, proofread_cache_path
+        proofread_cache = ProofreadCache(proofread_cache_path(args.cache_path))
+    
+    # The fetcher's memory of recent results never expires, which would keep serving the
+    # same transcripts for the life of the service; repeats are the transcript cache's job
+    transcriber = YouTubeTranscriber(
+        cache=cache,
+        fetcher=Fetcher(rate=args.rate, retries=args.retries, remember=0),
+        proofread=not args.no_proofread,
+        checkers=args.checkers,
+        language_tool_server=args.languagetool_server,
+        stop_words=load_stop_words(args.stop_words) if args.stop_words else STOP_WORDS,
+        sort_by=args.sort_by,
+        background=background,
+        ngrams=args.ngrams,
+        max_terms=args.max_terms,
+        language=args.language,
+        proofread_cache=proofread_cache
+    )
+    service = AnalysisService(transcriber, args.workers, args.queue_size, args.max_batch, args.fetch_workers)
+    
+    # Service managers stop processes with SIGTERM; shut down as cleanly as on Ctrl-C
+    import signal
+    
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+    
+    try:
+        if not args.no_warm_up:
+            service.warm_up()
+        server = make_server(service, args.host, args.port, args.verbose)
+        host, port = server.server_address[:2]
+        print(f"Serving on http://{host}:{port} (POST /analyze, GET /stats, GET /health)", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    finally:
+        service.close()
+        close_shared_pools()
+        stats = service.stats.snapshot()
+        print(f"Served {stats['requests']} requests, {stats['videos']} videos, "
+              f"{stats['rejected']} rejected", file=sys.stderr)
+        if cache is not None:
+            cache.close()
+        if proofread_cache is not None:
+            proofread_cache.close()
+
+SUBCOMMANDS = {
+    'analyze': analyze_main,
+    'corpus': corpus_main,
+    'serve': serve_main
+}
 
 if __name__ == '__main__':
     main()